@@ -0,0 +1,78 @@
+"""
+Weighted random sampling shared by the sheet script (src/base) and the web backend.
+Installed by both requirements files, see packages/rhythm_sampling/pyproject.toml.
+"""
+import random
+from functools import lru_cache
+from typing import Hashable, List, Sequence
+
+
+class AliasSampler:
+    """
+    Weighted random sampler using Vose's alias method.
+    Building the table is O(n), every draw afterwards is O(1).
+    """
+
+    def __init__(self, items: Sequence[Hashable], weights: Sequence[float]):
+        if len(items) != len(weights):
+            raise ValueError("The number of weights does not match the number of items")
+        if not items:
+            raise ValueError("Cannot sample from an empty population")
+        if any(w < 0 for w in weights):
+            raise ValueError("Weights must not be negative")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("Total of weights must be greater than zero")
+
+        self.items = tuple(items)
+        self.weights = tuple(weights)
+
+        n = len(items)
+        scaled = [w * n / total for w in weights]
+        self.prob = [0.0] * n
+        self.alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            if scaled[l] < 1.0:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # Whatever is left is 1.0 up to floating point error
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def draw_index(self, rng: random.Random = random) -> int:
+        """Draw the index of one item"""
+        u = rng.random() * len(self.prob)
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def draw(self, rng: random.Random = random):
+        """Draw one item"""
+        return self.items[self.draw_index(rng)]
+
+    def draw_many(self, k: int, rng: random.Random = random) -> List:
+        """Draw k items with replacement"""
+        return [self.items[self.draw_index(rng)] for _ in range(k)]
+
+
+@lru_cache(maxsize=128)
+def _cached_sampler(items: tuple, weights: tuple) -> AliasSampler:
+    return AliasSampler(items, weights)
+
+
+def get_sampler(items: Sequence[Hashable], weights: Sequence[float]) -> AliasSampler:
+    """
+    Get an alias sampler for the given items and weights.
+    Tables are cached by (items, weights), so repeated draws over the same weights
+    reuse the table while any change of weights builds a fresh one.
+    """
+    return _cached_sampler(tuple(items), tuple(float(w) for w in weights))
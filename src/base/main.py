@@ -1,13 +1,14 @@
 import time
-from collections import defaultdict
 import random
 
 from googleapiclient.discovery import build
 from google.oauth2.service_account import Credentials
 import pandas as pd
 from numpy import ndarray
+from rhythm_sampling import get_sampler
 
 from config import SCOPES, SHEET_ID, DEBUG, APPLICATION_CREDS
+from simulation import eligible_columns, simulate_distribution
 
 creds = Credentials.from_service_account_file(APPLICATION_CREDS, scopes=SCOPES)
 service = build("sheets", "v4", credentials=creds)
@@ -36,13 +37,9 @@ def main():
     print("New weights are: 55	60	85	135	110	90	100	145	135	110	85	65	95	105	110	100	105	100	105	105	")
 
 def choose_record(meeting_df: pd.DataFrame) -> tuple[str, str]:
-    present = meeting_df.loc[:, meeting_df.iloc[-1] == "TRUE"]
-    present = present.fillna("")
-    records = present.loc[1:5]
-    empty_ind = [col for col in records if records[col].sum() == ""]
-    present_and_has_list = present.drop(empty_ind, axis=1)
+    present_and_has_list = eligible_columns(meeting_df)
     weights = list(present_and_has_list.iloc[-2].astype(float))
-    chosen_one = random.choices(present_and_has_list.columns, weights=weights)[0]
+    chosen_one = get_sampler(present_and_has_list.columns, weights).draw()
 
     chosen_one_name = present_and_has_list.loc[0, chosen_one]
     chosen_list = [s for s in present_and_has_list.loc[1:5, chosen_one].tolist() if s]
@@ -69,16 +66,12 @@ def calculate_new_weights(meeting_df: pd.DataFrame,  person_ind: int) -> ndarray
 
     return points_arr
 
-def test_distribution(tries=1000):
+def test_distribution(tries=1_000_000):
     rows = get_rows()
     meeting_df = pd.DataFrame(rows[-8:])
-    counter = defaultdict(lambda : 0)
-    for i in range(tries):
-        person, record_ind = choose_record(meeting_df)
-
-        counter[person] += 1
-    for person, count in counter.items():
-        print(person, f"{100*count/tries}%")
+    distribution = simulate_distribution(meeting_df, tries=tries)
+    for person, (probability, low, high) in distribution.items():
+        print(person, f"{100*probability:.2f}% (95% CI {100*low:.2f}-{100*high:.2f}%)")
 
 
 def mainn():
@@ -96,7 +89,7 @@ def mainn():
 
 if __name__ == '__main__':
     if DEBUG:
-        print("1000 tries distribution:")
+        print("1000000 tries distribution:")
         test_distribution()
         print("\n\n")
 
@@ -0,0 +1,69 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from rhythm_sampling import AliasSampler
+
+
+def eligible_columns(meeting_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Columns of everyone who can be chosen, i.e. people present at the
+    meeting with at least one record on their list.
+    """
+    present = meeting_df.loc[:, meeting_df.iloc[-1] == "TRUE"]
+    present = present.fillna("")
+    records = present.loc[1:5]
+    empty_ind = [col for col in records if records[col].sum() == ""]
+    return present.drop(empty_ind, axis=1)
+
+
+def parse_meeting(meeting_df: pd.DataFrame) -> tuple[list[str], np.ndarray]:
+    """Extract the names and weights of everyone who can be chosen"""
+    present_and_has_list = eligible_columns(meeting_df)
+
+    names = list(present_and_has_list.loc[0])
+    weights = present_and_has_list.iloc[-2].astype(float).to_numpy()
+    return names, weights
+
+
+def simulate_distribution(
+    meeting_df: pd.DataFrame,
+    tries: int = 1_000_000,
+    batch_size: int = 1_000_000,
+    seed: Optional[int] = None,
+    z: float = 1.96,
+) -> dict[str, tuple[float, float, float]]:
+    """
+    Monte Carlo estimate of how likely each person is to be chosen.
+    The meeting frame is parsed once, then draws are made in batches of
+    batch_size with a vectorized alias table.
+    Returns {name: (probability, ci_low, ci_high)} with Wilson score intervals
+    (z=1.96 gives 95% confidence).
+    """
+    names, weights = parse_meeting(meeting_df)
+    sampler = AliasSampler(range(len(names)), weights)
+    prob = np.asarray(sampler.prob)
+    alias = np.asarray(sampler.alias)
+    n = len(names)
+
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(n, dtype=np.int64)
+    remaining = tries
+    while remaining > 0:
+        k = min(batch_size, remaining)
+        u = rng.random(k) * n
+        idx = u.astype(np.int64)
+        picks = np.where(u - idx < prob[idx], idx, alias[idx])
+        counts += np.bincount(picks, minlength=n)
+        remaining -= k
+
+    p = counts / tries
+    denominator = 1 + z**2 / tries
+    centre = (p + z**2 / (2 * tries)) / denominator
+    half_width = z * np.sqrt(p * (1 - p) / tries + z**2 / (4 * tries**2)) / denominator
+
+    return {
+        name: (float(p[i]), float(centre[i] - half_width[i]), float(centre[i] + half_width[i]))
+        for i, name in enumerate(names)
+    }
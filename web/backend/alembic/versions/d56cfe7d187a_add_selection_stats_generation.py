@@ -0,0 +1,29 @@
+"""Add selection stats generation counter
+
+Revision ID: d56cfe7d187a
+Revises: 9e366b535c64
+Create Date: 2026-10-17 09:41:27.305118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd56cfe7d187a'
+down_revision = '9e366b535c64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    generation = op.create_table('selection_stats_generation',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('generation', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(generation, [{'id': 1, 'generation': 0}])
+
+
+def downgrade() -> None:
+    op.drop_table('selection_stats_generation')
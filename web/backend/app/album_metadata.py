@@ -0,0 +1,93 @@
+import re
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from . import crud, db_models
+from .utils import (
+    extract_artist_title_from_rym_url,
+    extract_rym_album_details,
+    get_album_from_discogs,
+    get_album_from_musicbrainz,
+    normalize_rym_url,
+)
+
+
+def rym_url_key(rym_url: str) -> str:
+    """Cache key of a normalized RYM URL"""
+    return f"rym:{rym_url}"
+
+
+def artist_title_key(artist: str, title: str) -> str:
+    """Cache key of an artist + title search, ignoring case, punctuation and spacing"""
+    def normalize(value: str) -> str:
+        return " ".join(re.sub(r"[\W_]+", " ", value.casefold()).split())
+    return f"search:{normalize(artist)}|{normalize(title)}"
+
+
+def _cached_details(entry: db_models.AlbumMetadata) -> Optional[dict]:
+    if not entry.found:
+        return None
+    return {
+        "title": entry.title,
+        "artist": entry.artist,
+        "cover_url": entry.cover_url or "",
+        "rym_url": entry.rym_url or "",
+    }
+
+
+def lookup_album_by_rym_url(db: Session, rym_url: str) -> dict:
+    """
+    Album details (title, artist, cover_url, rym_url) for a RateYourMusic URL.
+
+    Results are cached in album_metadata under the normalized URL and under the
+    album's artist + title, so known albums don't touch the network. RYM is
+    scraped first; if that fails, MusicBrainz and then Discogs are searched by
+    the artist and title in the URL. Albums no source knows are cached as well,
+    for a shorter time. Raises ValueError when the album can't be found.
+    """
+    rym_url = normalize_rym_url(rym_url)
+    url_key = rym_url_key(rym_url)
+
+    entry = crud.get_album_metadata(db, url_key)
+    if entry is not None:
+        album_details = _cached_details(entry)
+        if album_details is None:
+            raise ValueError("Could not find album info from any source (cached result)")
+        album_details["rym_url"] = rym_url
+        return album_details
+
+    try:
+        album_details = extract_rym_album_details(rym_url)
+    except Exception as rym_error:
+        artist, title = extract_artist_title_from_rym_url(rym_url)
+        if not artist or not title:
+            raise ValueError(f"Could not extract artist and title from RYM URL. Original error: {str(rym_error)}")
+
+        search_key = artist_title_key(artist, title)
+        entry = crud.get_album_metadata(db, search_key)
+        lookup_keys = [url_key, search_key]
+        if entry is not None:
+            album_details, source = _cached_details(entry), entry.source
+            lookup_keys = [url_key]
+        else:
+            # Try MusicBrainz first, then Discogs
+            album_details, source = get_album_from_musicbrainz(artist, title), "musicbrainz"
+            if not album_details:
+                album_details, source = get_album_from_discogs(artist, title), "discogs"
+            if album_details:
+                album_details["rym_url"] = rym_url
+
+        crud.store_album_metadata(db, lookup_keys, album_details or None, source)
+        if not album_details:
+            raise ValueError(f"Could not find album info from any source. Original RYM error: {str(rym_error)}")
+        album_details["rym_url"] = rym_url
+        return album_details
+
+    crud.store_album_metadata(
+        db,
+        [url_key, artist_title_key(album_details["artist"], album_details["title"])],
+        album_details,
+        "rym"
+    )
+    return album_details
@@ -1,16 +1,47 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+import datetime
 import json
 
-from . import crud, models, db_models
+from . import config, crud, models, db_models
 from .database import get_db
 from .auth import get_current_active_user
-from .utils import extract_rym_album_details, get_album_from_musicbrainz, get_album_from_discogs, extract_artist_title_from_rym_url
+from .pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from .simulation import simulate_selections
+from .album_metadata import lookup_album_by_rym_url
 
 router = APIRouter()
 
 
+def _decode_cursor(cursor: Optional[str], skip: int = 0) -> Optional[dict]:
+    if cursor is None:
+        return None
+    # A cursor already says where the page starts, an offset on top of it is ambiguous
+    if skip:
+        raise HTTPException(status_code=400, detail="skip cannot be combined with cursor")
+    try:
+        return decode_cursor(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _after_keyset(cursor: Optional[str], skip: int = 0) -> Optional[dict]:
+    after = _decode_cursor(cursor, skip)
+    if after is not None and ("key" not in after or not isinstance(after.get("id"), int)):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return after
+
+
+def _after_id(cursor: Optional[str], skip: int = 0) -> Optional[int]:
+    values = _decode_cursor(cursor, skip)
+    if values is None:
+        return None
+    if not isinstance(values.get("id"), int):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+    return values["id"]
+
+
 # Person endpoints
 @router.post("/persons/", response_model=models.Person)
 def create_person(
@@ -24,12 +55,17 @@ def create_person(
 
 @router.get("/persons/", response_model=List[models.User])
 def read_persons(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    return crud.get_users(db, skip=skip, limit=limit)
+    users = crud.get_users(db, skip=skip, limit=limit, after_id=_after_id(cursor, skip))
+    if len(users) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": users[-1].id})
+    return users
 
 
 @router.get("/persons/{person_id}", response_model=models.User)
@@ -44,6 +80,41 @@ def read_person(
     return db_user
 
 
+@router.get("/persons/{person_id}/selections", response_model=List[models.Attendance])
+def read_person_attendance(
+    person_id: int,
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Selections the user took part in, newest first, with their weight before and after each draw.
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one.
+    """
+    after = _after_keyset(cursor, skip)
+    try:
+        attendance = crud.get_user_attendance(db, person_id, skip=skip, limit=limit, after=after)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(attendance) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = attendance[-1].cursor
+    return attendance
+
+
+@router.get("/persons/{person_id}/weight", response_model=models.WeightAt)
+def read_person_weight_at(
+    person_id: int,
+    at: datetime.datetime,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """The user's weight as of the given date"""
+    return models.WeightAt(user_id=person_id, at=at, weight=crud.get_user_weight_at(db, person_id, at))
+
+
 # Record endpoints
 @router.post("/records/", response_model=models.Record)
 def create_record(
@@ -61,31 +132,9 @@ def create_record_from_rym_url(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Create a new record from a RateYourMusic URL"""
+    """Create a new record from a RateYourMusic URL, using cached album details when known"""
     try:
-        # First try to extract album details directly from RYM
-        try:
-            album_details = extract_rym_album_details(rym_url)
-        except Exception as rym_error:
-            # If RYM scraping fails, extract artist and title from URL and try MusicBrainz
-            artist, title = extract_artist_title_from_rym_url(rym_url)
-            
-            if not artist or not title:
-                raise ValueError(f"Could not extract artist and title from RYM URL. Original error: {str(rym_error)}")
-            
-            # Try MusicBrainz first    
-            album_details = get_album_from_musicbrainz(artist, title)
-            
-            # If MusicBrainz fails, try Discogs
-            if not album_details:
-                album_details = get_album_from_discogs(artist, title)
-            
-            # If both APIs fail, raise an error
-            if not album_details:
-                raise ValueError(f"Could not find album info from any source. Original RYM error: {str(rym_error)}")
-                
-            # Add the RYM URL to the details
-            album_details["rym_url"] = rym_url
+        album_details = lookup_album_by_rym_url(db, rym_url)
         
         # Create record from extracted details
         record = models.RecordCreate(
@@ -105,14 +154,21 @@ def create_record_from_rym_url(
 
 @router.get("/records/", response_model=List[models.AllRecords])
 def read_all_records(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     include_used: bool = False,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get all records from all users with owner names"""
-    return crud.get_all_records_with_owner_name(db, skip=skip, limit=limit, include_used=include_used)
+    records = crud.get_all_records_with_owner_name(
+        db, skip=skip, limit=limit, include_used=include_used, after_id=_after_id(cursor, skip)
+    )
+    if len(records) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": records[-1]["id"]})
+    return records
 
 
 @router.get("/records/my", response_model=List[models.Record])
@@ -128,13 +184,18 @@ def read_my_records(
 
 @router.get("/records/history", response_model=List[models.AllRecords])
 def read_used_records(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Get records that have been used (selected) in the past"""
-    return crud.get_used_records_with_owner_name(db, skip=skip, limit=limit)
+    records = crud.get_used_records_with_owner_name(db, skip=skip, limit=limit, after_id=_after_id(cursor, skip))
+    if len(records) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": records[-1]["id"]})
+    return records
 
 
 @router.delete("/records/{record_id}", response_model=models.Record)
@@ -168,46 +229,123 @@ def perform_selection(
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    # Verify all participants exist
-    users = crud.get_users(db)
-    user_id_set = {u.id for u in users}
+    try:
+        return crud.choose_record_and_update_weights(db, participant_ids, current_user.id)
+    except crud.UnknownParticipantError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except crud.SelectionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/selection/batch", response_model=List[models.SelectionResult])
+def perform_batch_selection(
+    participant_ids: List[int] = Query(...),
+    rounds: int = Query(..., ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Perform several sequential selections (e.g. a whole evening's queue) in one transaction"""
+    try:
+        return crud.choose_records_and_update_weights(db, participant_ids, current_user.id, rounds)
+    except crud.UnknownParticipantError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except crud.SelectionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/selection/simulate", response_model=models.SimulationResult)
+def simulate_selection(
+    participant_ids: List[int] = Query(...),
+    rounds: int = Query(1000, ge=1, le=10000),
+    trials: int = Query(100, ge=1, le=200),
+    seed: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """Simulate future selections for the given participants without changing any weights"""
+    if rounds * trials * len(participant_ids) > config.SIMULATION_MAX_WORK:
+        raise HTTPException(
+            status_code=400,
+            detail=f"rounds * trials * participants must not exceed {config.SIMULATION_MAX_WORK}"
+        )
     
-    for pid in participant_ids:
-        if pid not in user_id_set:
-            raise HTTPException(
-                status_code=403, 
-                detail=f"User with ID {pid} not found"
-            )
+    candidates = crud.get_selection_candidates(db, participant_ids)
+    try:
+        crud.check_participants_exist(candidates, participant_ids)
+    except crud.UnknownParticipantError as e:
+        raise HTTPException(status_code=403, detail=str(e))
     
     try:
-        return crud.choose_record_and_update_weights(db, participant_ids, current_user.id)
+        outcome = simulate_selections(
+            weights=[user.weight for user, _ in candidates],
+            eligible=[bool(record_ids) for _, record_ids in candidates],
+            rounds=rounds,
+            max_points=crud.MAX_POINTS_PER_DRAW,
+            trials=trials,
+            seed=seed
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    
+    return models.SimulationResult(
+        rounds=rounds,
+        trials=trials,
+        users=[
+            models.UserSimulation(
+                user_id=user.id,
+                username=user.username,
+                current_weight=user.weight,
+                expected_selections=outcome["selection_counts"][i],
+                selection_share=outcome["selection_counts"][i] / rounds,
+                final_weight=outcome["final_weights"][i]
+            )
+            for i, (user, _) in enumerate(candidates)
+        ],
+        checkpoint_rounds=outcome["checkpoint_rounds"],
+        weight_trajectory=outcome["weight_trajectory"]
+    )
 
 
 @router.get("/selection/history/", response_model=List[models.Selection])
 @router.get("/selection/history/{cache_buster}", response_model=List[models.Selection])
 def read_selection_history(
+    response: Response,
     cache_buster: str = None,
     my_selections_only: bool = False,
     sort_by_rating: bool = False,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_active_user)
 ):
-    """Get selection history with optional filtering and sorting by rating"""
+    """
+    Get selection history with optional filtering and sorting by rating.
+    Pass the X-Next-Cursor header of a page as `cursor` to get the next one.
+    """
     # Log for debugging
     print(f"Selection history request: cache_buster={cache_buster}, my_selections_only={my_selections_only}, sort_by_rating={sort_by_rating}")
     
-    if my_selections_only:
-        return crud.get_selection_history(
-            db, user_id=current_user.id, skip=skip, limit=limit, sort_by_rating=sort_by_rating
-        )
-    else:
-        return crud.get_selection_history(
-            db, skip=skip, limit=limit, sort_by_rating=sort_by_rating
-        )
+    after = _after_keyset(cursor, skip)
+    try:
+        if my_selections_only:
+            selections = crud.get_selection_history(
+                db, user_id=current_user.id, skip=skip, limit=limit, sort_by_rating=sort_by_rating, after=after
+            )
+        else:
+            selections = crud.get_selection_history(
+                db, skip=skip, limit=limit, sort_by_rating=sort_by_rating, after=after
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(selections) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = selections[-1].cursor
+    return selections
 
 
 @router.get("/selection/stats/", response_model=models.SelectionStats)
@@ -222,6 +360,32 @@ def read_selection_stats(
         return crud.get_selection_stats(db)
 
 
+@router.get("/selection/analytics/", response_model=models.SelectionAnalytics)
+def read_selection_analytics(
+    user_id: Optional[int] = None,
+    rolling_window: int = Query(5, ge=1, le=100),
+    rolling_since: Optional[datetime.datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_active_user)
+):
+    """
+    Selections per month, rolling average rating per chooser (from `rolling_since`
+    on, default: the last 12 months), time since each user was last picked and the
+    weight trajectory of one user (default: yourself)
+    """
+    trajectory_user_id = user_id if user_id is not None else current_user.id
+    if rolling_since is None:
+        rolling_since = datetime.datetime.utcnow() - datetime.timedelta(days=365)
+    return models.SelectionAnalytics(
+        monthly=crud.get_monthly_selections(db),
+        rolling_since=rolling_since,
+        rolling_ratings=crud.get_rolling_ratings(db, window=rolling_window, since=rolling_since),
+        last_picked=crud.get_last_picked(db),
+        weight_trajectory_user_id=trajectory_user_id,
+        weight_trajectory=crud.get_weight_trajectory(db, trajectory_user_id)
+    )
+
+
 @router.post("/selections/{selection_id}/rate", response_model=models.Rating)
 def rate_selection(
     selection_id: int,
@@ -230,16 +394,17 @@ def rate_selection(
     current_user: models.User = Depends(get_current_active_user)
 ):
     """Rate a selection (0-10)"""
-    # Verify selection exists
-    selection = db.query(db_models.Selection).filter(
-        db_models.Selection.id == selection_id
+    # Verify selection exists and load the rater, who is returned with the rating, in one query
+    rater = db.query(db_models.User).filter(
+        db_models.User.id == current_user.id,
+        db.query(db_models.Selection).filter(db_models.Selection.id == selection_id).exists()
     ).first()
     
-    if not selection:
+    if not rater:
         raise HTTPException(
             status_code=404,
             detail=f"Selection with ID {selection_id} not found"
         )
     
     # Create or update rating
-    return crud.create_rating(db, current_user.id, selection_id, rating) 
\ No newline at end of file
+    return crud.create_rating(db, current_user.id, selection_id, rating, user=rater) 
\ No newline at end of file
@@ -8,7 +8,8 @@ from sqlalchemy.orm import Session
 
 from . import crud, db_models, models
 from .database import get_db
-from .utils import verify_password, create_access_token, SECRET_KEY, ALGORITHM, TokenData
+from .principals import principal_cache
+from .utils import verify_and_update_password, create_access_token, SECRET_KEY, ALGORITHM, TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -18,6 +19,7 @@ router = APIRouter()
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
 
 
 def authenticate_user(db: Session, username: str, password: str):
@@ -26,14 +28,22 @@ def authenticate_user(db: Session, username: str, password: str):
     if not user:
         print(f"Authentication failed: user '{username}' not found")
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = verify_and_update_password(password, user.hashed_password)
+    if not valid:
         print(f"Authentication failed: password verification failed for user '{username}'")
         return False
+    if new_hash:
+        # The stored hash uses an outdated scheme or cost
+        crud.update_password_hash(db, user.id, user.hashed_password, new_hash)
     print(f"Authentication successful for user '{username}' (id={user.id}, is_admin={user.is_admin})")
     return user
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> models.Principal:
+    """
+    Resolve the token to its user. Users are looked up by the token's user_id
+    and kept in the principal cache, so repeated requests don't hit the database.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -45,21 +55,37 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         if username is None:
             raise credentials_exception
         token_data = TokenData(username=username)
+        user_id = payload.get("user_id")
     except JWTError:
         raise credentials_exception
-    user = crud.get_user_by_username(db, username=token_data.username)
-    if user is None:
+    
+    principal = principal_cache.get(user_id) if isinstance(user_id, int) else None
+    if principal is None:
+        if isinstance(user_id, int):
+            user = crud.get_user(db, user_id)
+        else:
+            # Tokens issued before user_id was added to the payload
+            user = crud.get_user_by_username(db, username=token_data.username)
+        if user is None:
+            raise credentials_exception
+        principal = models.Principal(
+            id=user.id, username=user.username, is_active=user.is_active, is_admin=user.is_admin
+        )
+        principal_cache.put(principal)
+    
+    # A renamed user's old tokens are no longer valid
+    if principal.username != token_data.username:
         raise credentials_exception
-    return user
+    return principal
 
 
-async def get_current_active_user(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_user(current_user: models.Principal = Depends(get_current_user)):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-async def get_current_admin_user(current_user: models.User = Depends(get_current_active_user)):
+async def get_current_admin_user(current_user: models.Principal = Depends(get_current_active_user)):
     """Dependency to check if the current user is an admin."""
     if not current_user.is_admin:
         raise HTTPException(
@@ -70,9 +96,13 @@ async def get_current_admin_user(current_user: models.User = Depends(get_current
 
 
 @router.post("/token", response_model=Token)
-async def login_for_access_token(
+def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
 ):
+    """
+    Plain def, so the CPU-bound password check runs in the threadpool; bcrypt and
+    argon2 release the GIL, so concurrent logins use all cores.
+    """
     user = authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
@@ -80,16 +110,62 @@ async def login_for_access_token(
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    return _issue_tokens(db, user.id, user.username, user.is_admin)
+
+
+def _issue_tokens(db: Session, user_id: int, username: str, is_admin: bool, family_id: Optional[str] = None,
+                  refresh_token: Optional[str] = None) -> dict:
+    """Access token plus a refresh token (a new session unless one is passed in)"""
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
         data={
-            "sub": user.username,
-            "is_admin": user.is_admin,
-            "user_id": user.id
+            "sub": username,
+            "is_admin": is_admin,
+            "user_id": user_id
         }, 
         expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    if refresh_token is None:
+        refresh_token = crud.create_refresh_token(db, user_id, family_id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/token/refresh", response_model=Token)
+def refresh_access_token(request: models.RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token and a new refresh token,
+    without checking the password again. The old refresh token stops working.
+    """
+    refresh_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        user_id, refresh_token = crud.rotate_refresh_token(db, request.refresh_token)
+    except crud.RefreshTokenError:
+        raise refresh_exception
+    
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = crud.get_user(db, user_id)
+        if user is None:
+            raise refresh_exception
+        principal = models.Principal(
+            id=user.id, username=user.username, is_active=user.is_active, is_admin=user.is_admin
+        )
+        principal_cache.put(principal)
+    if not principal.is_active:
+        crud.revoke_user_refresh_tokens(db, user_id)
+        raise refresh_exception
+    return _issue_tokens(db, principal.id, principal.username, principal.is_admin, refresh_token=refresh_token)
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(request: models.RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Revoke the session the refresh token belongs to"""
+    crud.revoke_refresh_token(db, request.refresh_token)
+    return None
 
 
 @router.post("/register", response_model=models.User)
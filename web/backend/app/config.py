@@ -12,6 +12,44 @@ SHEET_ID = os.getenv("GOOGLE_SHEET_ID")
 APPLICATION_CREDS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
 
+# Database settings
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./rhythm_roulette.db")
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")  # See database.SQLITE_PROFILES
+# Connection pool, used for server databases such as PostgreSQL
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() in ("true", "1", "t")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))  # 0 disables it
+
+# Password hashing: bcrypt, or argon2 (needs argon2-cffi). Hashes made with another
+# scheme or cost are still accepted and are rehashed on the next successful login.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))  # work factor, each step doubles the cost
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+# Refresh tokens (rotated on every use, stored hashed in refresh_tokens)
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Authenticated user cache (see principals.py)
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))  # seconds, 0 disables the cache
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+
+# Album metadata lookups. The upstream base URLs can point at a local stub server.
+RYM_BASE_URL = os.getenv("RYM_BASE_URL", "https://rateyourmusic.com")
+MUSICBRAINZ_BASE_URL = os.getenv("MUSICBRAINZ_BASE_URL", "https://musicbrainz.org")
+DISCOGS_BASE_URL = os.getenv("DISCOGS_BASE_URL", "https://api.discogs.com")
+MUSICBRAINZ_REQUEST_INTERVAL = float(os.getenv("MUSICBRAINZ_REQUEST_INTERVAL", "1"))  # seconds, MusicBrainz allows 1 request/s
+ALBUM_LOOKUP_TIMEOUT = float(os.getenv("ALBUM_LOOKUP_TIMEOUT", "10"))  # seconds per upstream request
+ALBUM_CACHE_TTL = int(os.getenv("ALBUM_CACHE_TTL", str(30 * 24 * 3600)))  # seconds a found album stays cached
+ALBUM_CACHE_NEGATIVE_TTL = int(os.getenv("ALBUM_CACHE_NEGATIVE_TTL", "900"))  # seconds a failed lookup stays cached
+
+# Selection simulation: largest rounds * trials * participants a single request may ask for
+SIMULATION_MAX_WORK = int(os.getenv("SIMULATION_MAX_WORK", "50000000"))
+
 # API Settings
 API_PREFIX = "/api/v1"
 PROJECT_NAME = "Rhythm Roulette" 
\ No newline at end of file
@@ -2,7 +2,6 @@
 import asyncio
 import os
 import sys
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Add backend directory to sys.path
@@ -10,7 +9,7 @@ BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(BACKEND_DIR)) # Add parent directory (where app lives)
 
 from app.db_models import User
-from app.database import SQLALCHEMY_DATABASE_URL, Base
+from app.database import Base, create_db_engine
 from app.crud import get_password_hash
 
 # --- Admin User Details ---
@@ -19,7 +18,7 @@ ADMIN_PASSWORD = "klop08"
 ADMIN_EMAIL = "admin@example.com" # Using a placeholder email
 # --------------------------
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine(pooled=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def create_admin_user():
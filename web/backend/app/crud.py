@@ -1,11 +1,20 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, String, and_, case, cast, exists, func, literal, literal_column, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, aliased, selectinload
+from rhythm_sampling import get_sampler
 import json
 import random
+import secrets
+import time
+from collections import Counter
 from typing import List, Optional
 import datetime
 
-from . import db_models, models
-from .utils import get_password_hash, verify_password
+from . import config, db_models, models
+from .pagination import after_keyset, check_cursor_sort, encode_cursor
+from .stats import SelectionCounts, selection_stats
+from .utils import generate_refresh_token, get_password_hash, hash_refresh_token, verify_password
 
 
 # User operations
@@ -21,8 +30,11 @@ def get_user_by_username(db: Session, username: str):
     return db.query(db_models.User).filter(db_models.User.username == username).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(db_models.User).offset(skip).limit(limit).all()
+def get_users(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
+    query = db.query(db_models.User)
+    if after_id is not None:
+        query = query.filter(db_models.User.id > after_id)
+    return query.order_by(db_models.User.id).offset(skip).limit(limit).all()
 
 
 def create_user(db: Session, user: models.UserCreate):
@@ -39,13 +51,177 @@ def create_user(db: Session, user: models.UserCreate):
     return db_user
 
 
-def update_user_weight(db: Session, user_id: int, new_weight: float):
-    db_user = db.query(db_models.User).filter(db_models.User.id == user_id).first()
-    if db_user:
-        db_user.weight = new_weight
-        db.commit()
-        db.refresh(db_user)
-    return db_user
+def update_password_hash(db: Session, user_id: int, old_hash: str, new_hash: str) -> bool:
+    """
+    Replace a user's password hash unless it was changed in the meantime.
+    Doesn't bump the user's version, so concurrent draws aren't affected.
+    """
+    updated = db.query(db_models.User).filter(
+        db_models.User.id == user_id,
+        db_models.User.hashed_password == old_hash
+    ).update({db_models.User.hashed_password: new_hash}, synchronize_session=False)
+    db.commit()
+    return updated == 1
+
+
+def update_user_weights(db: Session, new_weights: dict, expected_versions: Optional[dict] = None) -> int:
+    """
+    Set the weights of several users with a single bulk UPDATE and bump their versions.
+    If expected_versions is given, only rows still at that version are updated.
+    Does not commit, so it can be part of a larger transaction.
+    Returns the number of updated rows.
+    """
+    if not new_weights:
+        return 0
+    query = db.query(db_models.User).filter(
+        db_models.User.id.in_(new_weights.keys())
+    )
+    if expected_versions is not None:
+        query = query.filter(
+            db_models.User.version == case(expected_versions, value=db_models.User.id)
+        )
+    return query.update(
+        {
+            db_models.User.weight: case(new_weights, value=db_models.User.id),
+            db_models.User.version: db_models.User.version + 1
+        },
+        synchronize_session=False
+    )
+
+
+# Refresh token operations
+# A rotated token presented again within this window is most likely a race between
+# browser tabs rather than a stolen copy, so it is rejected without revoking the family
+REFRESH_TOKEN_REUSE_GRACE = datetime.timedelta(seconds=30)
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused"""
+
+
+def create_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """
+    Store a new refresh token for the user and return it. Tokens rotated from the
+    same login share a family; a new login starts a new one.
+    """
+    token = generate_refresh_token()
+    now = datetime.datetime.utcnow()
+    
+    # Drop the user's expired tokens while we're here
+    db.query(db_models.RefreshToken).filter(
+        db_models.RefreshToken.user_id == user_id,
+        db_models.RefreshToken.expires_at <= now
+    ).delete(synchronize_session=False)
+    
+    db.add(db_models.RefreshToken(
+        user_id=user_id,
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        created_at=now,
+        expires_at=now + datetime.timedelta(days=config.REFRESH_TOKEN_EXPIRE_DAYS)
+    ))
+    db.commit()
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> tuple:
+    """
+    Exchange a refresh token for a new one of the same family and return
+    (user_id, new_token). Presenting an already rotated token after the grace
+    period means it was copied, so the whole family is revoked.
+    """
+    db_token = db.query(db_models.RefreshToken).filter(
+        db_models.RefreshToken.token_hash == hash_refresh_token(token)
+    ).first()
+    if db_token is None:
+        raise RefreshTokenError("Unknown refresh token")
+    
+    now = datetime.datetime.utcnow()
+    user_id, family_id = db_token.user_id, db_token.family_id
+    if db_token.revoked_at is not None:
+        if now - db_token.revoked_at > REFRESH_TOKEN_REUSE_GRACE:
+            revoke_refresh_token_family(db, family_id)
+        raise RefreshTokenError("Refresh token was already used")
+    if db_token.expires_at <= now:
+        raise RefreshTokenError("Refresh token has expired")
+    
+    # Only one of several concurrent requests with the same token wins
+    revoked = db.query(db_models.RefreshToken).filter(
+        db_models.RefreshToken.id == db_token.id,
+        db_models.RefreshToken.revoked_at == None
+    ).update({db_models.RefreshToken.revoked_at: now}, synchronize_session=False)
+    if revoked != 1:
+        db.rollback()
+        raise RefreshTokenError("Refresh token was already used")
+    
+    return user_id, create_refresh_token(db, user_id, family_id)
+
+
+def revoke_refresh_token_family(db: Session, family_id: str) -> int:
+    """Revoke every token rotated from the same login"""
+    revoked = db.query(db_models.RefreshToken).filter(
+        db_models.RefreshToken.family_id == family_id,
+        db_models.RefreshToken.revoked_at == None
+    ).update({db_models.RefreshToken.revoked_at: datetime.datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return revoked
+
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    """Log out the session a refresh token belongs to"""
+    family_id = db.query(db_models.RefreshToken.family_id).filter(
+        db_models.RefreshToken.token_hash == hash_refresh_token(token)
+    ).scalar()
+    if family_id is None:
+        return False
+    revoke_refresh_token_family(db, family_id)
+    return True
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: int) -> int:
+    """Log out all sessions of a user, e.g. after a password change"""
+    revoked = db.query(db_models.RefreshToken).filter(
+        db_models.RefreshToken.user_id == user_id,
+        db_models.RefreshToken.revoked_at == None
+    ).update({db_models.RefreshToken.revoked_at: datetime.datetime.utcnow()}, synchronize_session=False)
+    db.commit()
+    return revoked
+
+
+# Album metadata cache operations
+def get_album_metadata(db: Session, lookup_key: str) -> Optional[db_models.AlbumMetadata]:
+    """Cached lookup result for the key, unless it has expired"""
+    return db.query(db_models.AlbumMetadata).filter(
+        db_models.AlbumMetadata.lookup_key == lookup_key,
+        db_models.AlbumMetadata.expires_at > datetime.datetime.utcnow()
+    ).first()
+
+
+def store_album_metadata(db: Session, lookup_keys: List[str], details: Optional[dict], source: Optional[str] = None):
+    """
+    Cache a lookup result under each of the keys, replacing older entries.
+    details=None caches that the album wasn't found, for a shorter time.
+    """
+    now = datetime.datetime.utcnow()
+    ttl = config.ALBUM_CACHE_TTL if details else config.ALBUM_CACHE_NEGATIVE_TTL
+    values = {
+        "found": details is not None,
+        "title": details["title"] if details else None,
+        "artist": details["artist"] if details else None,
+        "cover_url": details.get("cover_url") if details else None,
+        "rym_url": details.get("rym_url") if details else None,
+        "source": source if details else None,
+        "fetched_at": now,
+        "expires_at": now + datetime.timedelta(seconds=ttl),
+    }
+    table = db_models.AlbumMetadata.__table__
+    for lookup_key in dict.fromkeys(lookup_keys):
+        insert = _insert_for_dialect(db, table).values(lookup_key=lookup_key, **values)
+        db.execute(insert.on_conflict_do_update(
+            index_elements=[table.c.lookup_key],
+            set_={name: insert.excluded[name] for name in values}
+        ))
+    db.commit()
 
 
 # Record operations
@@ -66,7 +242,13 @@ def get_all_records(db: Session, skip: int = 0, limit: int = 100, include_used:
     return query.offset(skip).limit(limit).all()
 
 
-def get_all_records_with_owner_name(db: Session, skip: int = 0, limit: int = 100, include_used: bool = False):
+def get_all_records_with_owner_name(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    include_used: bool = False,
+    after_id: Optional[int] = None
+):
     # Join with the User table to get owner names
     query = db.query(
         db_models.Record, 
@@ -77,8 +259,11 @@ def get_all_records_with_owner_name(db: Session, skip: int = 0, limit: int = 100
     
     if not include_used:
         query = query.filter(db_models.Record.used == False)
+    
+    if after_id is not None:
+        query = query.filter(db_models.Record.id > after_id)
         
-    records_with_owners = query.offset(skip).limit(limit).all()
+    records_with_owners = query.order_by(db_models.Record.id).offset(skip).limit(limit).all()
     
     # Convert to AllRecords model
     result = []
@@ -94,6 +279,77 @@ def get_all_records_with_owner_name(db: Session, skip: int = 0, limit: int = 100
     return result
 
 
+# Columns the admin records listing can be sorted by
+ADMIN_RECORD_SORT_COLUMNS = {
+    "id": db_models.Record.id,
+    "title": db_models.Record.title,
+    "artist": db_models.Record.artist,
+    "owner_name": db_models.User.username,
+    "used": db_models.Record.used,
+}
+
+
+def get_admin_records(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    owner_id: Optional[int] = None,
+    used: Optional[bool] = None,
+    artist_prefix: Optional[str] = None,
+    sort_by: str = "id",
+    descending: bool = False
+) -> tuple:
+    """
+    One page of records with their owner's name for the admin listing, joined in
+    a single query, together with the number of records matching the filters.
+    """
+    if sort_by not in ADMIN_RECORD_SORT_COLUMNS:
+        raise ValueError(f"Cannot sort records by '{sort_by}'")
+    
+    filters = []
+    if owner_id is not None:
+        filters.append(db_models.Record.owner_id == owner_id)
+    if used is not None:
+        filters.append(db_models.Record.used == used)
+    if artist_prefix:
+        filters.append(db_models.Record.artist.istartswith(artist_prefix, autoescape=True))
+    
+    total = db.query(func.count(db_models.Record.id)).filter(*filters).scalar()
+    
+    sort_column = ADMIN_RECORD_SORT_COLUMNS[sort_by]
+    id_column = db_models.Record.id
+    rows = db.query(
+        db_models.Record.id,
+        db_models.Record.title,
+        db_models.Record.artist,
+        db_models.Record.cover_url,
+        db_models.Record.rym_url,
+        db_models.Record.owner_id,
+        db_models.User.username,
+        db_models.Record.used
+    ).outerjoin(
+        db_models.User, db_models.User.id == db_models.Record.owner_id
+    ).filter(*filters).order_by(
+        sort_column.desc() if descending else sort_column,
+        id_column.desc() if descending else id_column
+    ).offset(skip).limit(limit).all()
+    
+    records = [
+        {
+            "id": record_id,
+            "title": title,
+            "artist": artist,
+            "cover_url": cover_url,
+            "rym_url": rym_url,
+            "owner_id": record_owner_id,
+            "owner_name": owner_name or "None",
+            "used": record_used,
+        }
+        for record_id, title, artist, cover_url, rym_url, record_owner_id, owner_name, record_used in rows
+    ]
+    return records, total
+
+
 def get_used_records(db: Session, skip: int = 0, limit: int = 100):
     """Get records that have been used (selected) in the past"""
     return db.query(db_models.Record).filter(
@@ -101,16 +357,21 @@ def get_used_records(db: Session, skip: int = 0, limit: int = 100):
     ).offset(skip).limit(limit).all()
 
 
-def get_used_records_with_owner_name(db: Session, skip: int = 0, limit: int = 100):
+def get_used_records_with_owner_name(db: Session, skip: int = 0, limit: int = 100, after_id: Optional[int] = None):
     """Get used records with owner information"""
-    records_with_owners = db.query(
+    query = db.query(
         db_models.Record, 
         db_models.User.username.label("owner_name")
     ).join(
         db_models.User, db_models.Record.owner_id == db_models.User.id
     ).filter(
         db_models.Record.used == True
-    ).offset(skip).limit(limit).all()
+    )
+    
+    if after_id is not None:
+        query = query.filter(db_models.Record.id > after_id)
+    
+    records_with_owners = query.order_by(db_models.Record.id).offset(skip).limit(limit).all()
     
     # Convert to model
     result = []
@@ -153,42 +414,149 @@ def delete_record(db: Session, record_id: int):
             "owner_id": db_record.owner_id,
             "used": db_record.used
         }
-        # Delete the record
+        # Delete the record; this clears it from the selections it was chosen in
         db.delete(db_record)
+        bump_selection_stats_generation(db)
         db.commit()
         return record_data
     return None
 
 
 # Rating operations
-def create_rating(db: Session, user_id: int, selection_id: int, rating: float):
+def _insert_for_dialect(db: Session, table):
+    """INSERT construct of the session's dialect, which supports ON CONFLICT"""
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(table)
+    return sqlite.insert(table)
+
+
+MAX_RATING_ATTEMPTS = 3
+RATING_RETRY_BACKOFF = 0.05  # seconds
+
+
+def create_rating(
+    db: Session,
+    user_id: int,
+    selection_id: int,
+    rating: float,
+    user: Optional[db_models.User] = None
+) -> models.Rating:
     """
     Create or update a rating for a selection.
     If the user has already rated this selection, update the existing rating.
+    The rating is written with a single upsert that keeps the selection's
+    rating_sum/rating_count aggregates up to date in the same transaction.
+    The result is built from the upsert's RETURNING row and the given
+    (already loaded) user, without reading the rating back.
     """
-    # Check if rating already exists
-    existing_rating = db.query(db_models.Rating).filter(
-        db_models.Rating.user_id == user_id,
-        db_models.Rating.selection_id == selection_id
-    ).first()
+    last_error = None
+    for attempt in range(MAX_RATING_ATTEMPTS):
+        try:
+            row = _upsert_rating(db, user_id, selection_id, rating)
+            if row is None:
+                db.rollback()
+                continue
+            db_rating = models.Rating(
+                id=row.id,
+                rating=row.rating,
+                user_id=row.user_id,
+                selection_id=row.selection_id,
+                timestamp=row.timestamp,
+                user=models.User.model_validate(user, from_attributes=True) if user is not None else None
+            )
+            db.commit()
+            return db_rating
+        except OperationalError as e:
+            db.rollback()
+            if not _is_lock_error(e):
+                raise
+            last_error = e
+            time.sleep(random.uniform(0, RATING_RETRY_BACKOFF * (attempt + 1)))
+        except Exception:
+            db.rollback()
+            raise
+    raise last_error or RuntimeError("Rating failed because of concurrent ratings, please try again")
+
+
+def _upsert_rating(db: Session, user_id: int, selection_id: int, rating: float):
+    """
+    Write one rating and update the selection's aggregates (no commit).
+    Returns the rating row, or None when a concurrent first rating of the same
+    user won the insert and the statement has to be repeated.
+    """
+    ratings = db_models.Rating.__table__
+    selections = db_models.Selection.__table__
+    returned_columns = [
+        ratings.c.id, ratings.c.user_id, ratings.c.selection_id, ratings.c.rating, ratings.c.timestamp
+    ]
     
-    if existing_rating:
-        # Update existing rating
-        existing_rating.rating = rating
-        db.commit()
-        db.refresh(existing_rating)
-        return existing_rating
-    else:
-        # Create new rating
-        db_rating = db_models.Rating(
-            user_id=user_id,
-            selection_id=selection_id,
-            rating=rating
-        )
-        db.add(db_rating)
+    if db.get_bind().dialect.name != "postgresql":
+        # SQLite serializes writers and the upsert takes the write lock, so the
+        # aggregates can simply be recomputed from the selection's ratings
+        upsert = sqlite.insert(ratings).values(user_id=user_id, selection_id=selection_id, rating=rating)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[ratings.c.selection_id, ratings.c.user_id],
+            set_={"rating": upsert.excluded.rating}
+        ).returning(*returned_columns)
+        row = db.execute(upsert).one()
+        refresh_rating_aggregates(db, selection_id, commit=False)
+        return row
+    
+    # On PostgreSQL everything happens in one statement: the previous rating is
+    # locked and read first (the upsert's source depends on it), the upsert
+    # returns whether it inserted, and the aggregates are adjusted by the difference
+    previous = select(ratings.c.rating).where(
+        ratings.c.selection_id == selection_id,
+        ratings.c.user_id == user_id
+    ).with_for_update().cte("previous")
+    source = select(literal(user_id), literal(selection_id), literal(rating)).where(
+        select(func.count()).select_from(previous).scalar_subquery() >= 0
+    )
+    upsert = postgresql.insert(ratings).from_select(["user_id", "selection_id", "rating"], source)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[ratings.c.selection_id, ratings.c.user_id],
+        set_={"rating": upsert.excluded.rating}
+    ).returning(*returned_columns, literal_column("xmax = 0").label("inserted")).cte("upsert")
+    aggregates = selections.update().where(selections.c.id == selection_id).values(
+        rating_sum=selections.c.rating_sum + rating - func.coalesce(select(previous.c.rating).scalar_subquery(), 0),
+        rating_count=selections.c.rating_count + case((select(upsert.c.inserted).scalar_subquery(), 1), else_=0)
+    ).returning(selections.c.id).cte("aggregates")
+    row = db.execute(
+        select(
+            upsert.c.id, upsert.c.user_id, upsert.c.selection_id, upsert.c.rating, upsert.c.timestamp,
+            # Neither inserted nor found before: a concurrent first rating won the insert
+            and_(~upsert.c.inserted, ~exists(select(previous.c.rating))).label("raced")
+        ).add_cte(aggregates)
+    ).one()
+    return None if row.raced else row
+
+
+def refresh_rating_aggregates(db: Session, selection_id: Optional[int] = None, commit: bool = True) -> int:
+    """
+    Recompute rating_sum/rating_count from the ratings table, for one selection
+    or for all of them. Returns the number of updated selections.
+    """
+    rating_sum = db.query(
+        func.coalesce(func.sum(db_models.Rating.rating), 0)
+    ).filter(
+        db_models.Rating.selection_id == db_models.Selection.id
+    ).scalar_subquery()
+    rating_count = db.query(
+        func.count(db_models.Rating.id)
+    ).filter(
+        db_models.Rating.selection_id == db_models.Selection.id
+    ).scalar_subquery()
+    
+    query = db.query(db_models.Selection)
+    if selection_id is not None:
+        query = query.filter(db_models.Selection.id == selection_id)
+    updated = query.update(
+        {db_models.Selection.rating_sum: rating_sum, db_models.Selection.rating_count: rating_count},
+        synchronize_session=False
+    )
+    if commit:
         db.commit()
-        db.refresh(db_rating)
-        return db_rating
+    return updated
 
 
 def get_ratings_for_selection(db: Session, selection_id: int):
@@ -198,30 +566,64 @@ def get_ratings_for_selection(db: Session, selection_id: int):
     ).all()
 
 
+def average_rating_expression():
+    """SQL expression for a selection's average rating (NULL when unrated)"""
+    return case(
+        (db_models.Selection.rating_count > 0, db_models.Selection.rating_sum / db_models.Selection.rating_count),
+        else_=None
+    )
+
+
 def calculate_average_rating(db: Session, selection_id: int) -> float:
     """Calculate the average rating for a selection"""
-    ratings = db.query(db_models.Rating.rating).filter(
-        db_models.Rating.selection_id == selection_id
-    ).all()
-    
-    if not ratings:
-        return None
-    
-    return sum(r.rating for r in ratings) / len(ratings)
+    return db.query(average_rating_expression()).filter(
+        db_models.Selection.id == selection_id
+    ).scalar()
 
 
 # Selection operations
+def _timestamp_sort_key(db: Session, column):
+    """
+    Expression to order and compare timestamps by.
+    SQLite keeps timestamps as text, partly with and partly without microseconds,
+    which breaks equality checks, so there they are compared as Julian day numbers.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return func.julianday(column)
+    return column
+
+
+def _selection_history_order(db: Session, sort_by_rating: bool):
+    """Sort key of the selection history and whether IDs break ties descending"""
+    if sort_by_rating:
+        # Sort by rating (descending) in the database; unrated selections count as 0
+        return func.coalesce(average_rating_expression(), 0), False
+    # Default sorting by timestamp (descending)
+    return _timestamp_sort_key(db, db_models.Selection.timestamp), True
+
+
 def get_selection_history(
     db: Session, 
     user_id: Optional[int] = None, 
     skip: int = 0, 
     limit: int = 100,
-    sort_by_rating: bool = False
+    sort_by_rating: bool = False,
+    after: Optional[dict] = None
 ):
     """
     Get selection history with optional filtering by user and sorting by rating.
     Includes average rating and all individual ratings for each selection.
+    Pass a decoded cursor as `after` to continue after a previous page (keyset
+    pagination); every returned selection carries the cursor pointing past it.
+    Raises ValueError if the cursor was issued for the other sort order.
     """
+    sort = "rating" if sort_by_rating else "timestamp"
+    if after is not None:
+        check_cursor_sort(after, sort)
+    
+    # Average rating from the materialized rating aggregates
+    average_rating_column = average_rating_expression()
+    
     # Base query - only filter out selections where timestamp is explicitly NULL
     query = db.query(db_models.Selection).filter(db_models.Selection.timestamp != None)
     
@@ -229,204 +631,476 @@ def get_selection_history(
     if user_id:
         query = query.filter(db_models.Selection.user_id == user_id)
     
-    # Get all selection IDs that match the criteria
-    selection_ids = [s.id for s in query.all()]
+    sort_key, id_descending = _selection_history_order(db, sort_by_rating)
     
-    # If sorting by rating, calculate average ratings and sort
-    if sort_by_rating and selection_ids:
-        # Calculate average ratings for each selection
-        selection_ratings = []
-        for selection_id in selection_ids:
-            avg_rating = calculate_average_rating(db, selection_id)
-            selection_ratings.append((selection_id, avg_rating or 0))  # Use 0 for selections with no ratings
-        
-        # Sort by rating (descending)
-        selection_ratings.sort(key=lambda x: x[1], reverse=True)
-        
-        # Get selections in the sorted order
-        sorted_ids = [s[0] for s in selection_ratings]
-        
-        # Fetch selections in the specified order, with pagination
-        # Need to use a case statement to order by the sorted_ids list
-        from sqlalchemy import case
-        ordering = case(
-            {id_val: i for i, id_val in enumerate(sorted_ids)},
-            value=db_models.Selection.id
-        )
-        selections = query.filter(db_models.Selection.id.in_(sorted_ids)).order_by(ordering).offset(skip).limit(limit).all()
-    else:
-        # Default sorting by timestamp (descending)
-        selections = query.order_by(db_models.Selection.timestamp.desc()).offset(skip).limit(limit).all()
+    if after is not None:
+        query = query.filter(after_keyset(
+            sort_key, db_models.Selection.id, after["key"], after["id"], id_descending=id_descending
+        ))
+    query = query.order_by(
+        sort_key.desc(),
+        db_models.Selection.id.desc() if id_descending else db_models.Selection.id
+    )
     
-    # Filter out any selections with invalid data and enrich with rating information
+    # Load the page together with its average ratings; related users, records and
+    # ratings are fetched with one extra query per relationship instead of per row
+    rows = query.add_columns(average_rating_column, sort_key).options(
+        selectinload(db_models.Selection.chosen_user),
+        selectinload(db_models.Selection.record),
+        selectinload(db_models.Selection.ratings).selectinload(db_models.Rating.user)
+    ).offset(skip).limit(limit).all()
+    
+    # Enrich selections with rating information
     valid_selections = []
-    for selection in selections:
-        # Skip selections with missing required data (only skip if timestamp is actually None)
-        if selection.timestamp is None:
-            continue
-            
-        # Enrich selection with rating information
-        selection.ratings = get_ratings_for_selection(db, selection.id)
-        selection.average_rating = calculate_average_rating(db, selection.id)
-        
-        # Make sure chosen_user and record are properly loaded
-        if selection.chosen_user_id and not selection.chosen_user:
-            selection.chosen_user = db.query(db_models.User).get(selection.chosen_user_id)
-            
-        if selection.record_id and not selection.record:
-            selection.record = db.query(db_models.Record).get(selection.record_id)
-        
+    for selection, average_rating, key in rows:
+        selection.average_rating = average_rating
+        selection.cursor = encode_cursor({"sort": sort, "key": key, "id": selection.id})
         valid_selections.append(selection)
     
     return valid_selections
 
 
+def get_admin_selections(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    sort_by_rating: bool = False
+) -> List[dict]:
+    """
+    Selection history for the admin views in one joined query: the chosen user
+    and the selector are two aliases of users, and the rating count and average
+    come from the materialized rating aggregates.
+    """
+    chosen_user = aliased(db_models.User)
+    selector = aliased(db_models.User)
+    sort_key, id_descending = _selection_history_order(db, sort_by_rating)
+    
+    rows = db.query(
+        db_models.Selection.id,
+        db_models.Selection.timestamp,
+        db_models.Selection.participants,
+        db_models.Selection.rating_count,
+        average_rating_expression(),
+        chosen_user.id,
+        chosen_user.username,
+        db_models.Record.id,
+        db_models.Record.title,
+        db_models.Record.artist,
+        selector.id,
+        selector.username
+    ).outerjoin(
+        chosen_user, chosen_user.id == db_models.Selection.chosen_user_id
+    ).outerjoin(
+        db_models.Record, db_models.Record.id == db_models.Selection.record_id
+    ).outerjoin(
+        selector, selector.id == db_models.Selection.user_id
+    ).filter(
+        db_models.Selection.timestamp != None
+    ).order_by(
+        sort_key.desc(),
+        db_models.Selection.id.desc() if id_descending else db_models.Selection.id
+    ).offset(skip).limit(limit).all()
+    
+    return [
+        {
+            "id": selection_id,
+            "timestamp": timestamp,
+            "chosen_user": {"id": chosen_id, "username": chosen_username} if chosen_id else None,
+            "record": {"id": record_id, "title": title, "artist": artist} if record_id else None,
+            "selector": {"id": selector_id, "username": selector_username} if selector_id else None,
+            "participants": participants,
+            "average_rating": average_rating,
+            "ratings_count": rating_count
+        }
+        for (selection_id, timestamp, participants, rating_count, average_rating, chosen_id, chosen_username,
+             record_id, title, artist, selector_id, selector_username) in rows
+    ]
+
+
+def parse_participants(participants: Optional[str]) -> List[int]:
+    """Parse a comma-separated list of user IDs, skipping duplicates and blanks"""
+    participant_ids = []
+    for part in (participants or "").split(","):
+        part = part.strip()
+        if part.isdigit() and int(part) not in participant_ids:
+            participant_ids.append(int(part))
+    return participant_ids
+
+
+def backfill_selection_participants(db: Session, batch_size: int = 1000) -> int:
+    """
+    Create the missing selection_participants rows from the comma-separated
+    participants and the weight_changes JSON of each selection. Selections are
+    replayed in chronological order, so a participant's weight before a draw is
+    their weight after the previous one they attended. Selections that already
+    have participant rows are left alone. Returns the number of created rows.
+    """
+    has_rows = exists().where(db_models.SelectionParticipant.selection_id == db_models.Selection.id)
+    rows = db.query(
+        db_models.Selection.id,
+        db_models.Selection.participants,
+        db_models.Selection.weight_changes,
+        has_rows
+    ).filter(
+        db_models.Selection.participants != None
+    ).order_by(db_models.Selection.timestamp, db_models.Selection.id).yield_per(batch_size)
+    
+    last_weights = {}
+    batch = []
+    created = 0
+    for selection_id, participants, weight_changes, already_backfilled in rows:
+        try:
+            weights = {int(k): float(v) for k, v in json.loads(weight_changes or "{}").items()}
+        except (ValueError, TypeError, AttributeError):
+            weights = {}
+        
+        for participant_id in parse_participants(participants):
+            weight_after = weights.get(participant_id)
+            if not already_backfilled:
+                batch.append({
+                    "selection_id": selection_id,
+                    "user_id": participant_id,
+                    "weight_before": last_weights.get(participant_id),
+                    "weight_after": weight_after,
+                })
+            if weight_after is not None:
+                last_weights[participant_id] = weight_after
+        
+        if len(batch) >= batch_size:
+            created += len(batch)
+            db.execute(db_models.SelectionParticipant.__table__.insert(), batch)
+            batch = []
+    
+    if batch:
+        created += len(batch)
+        db.execute(db_models.SelectionParticipant.__table__.insert(), batch)
+    db.commit()
+    return created
+
+
 def create_selection(
     db: Session, 
     selection: models.SelectionCreate, 
     user_id: int,
-    weight_changes: dict
+    weight_changes: dict,
+    commit: bool = True,
+    weights_before: Optional[dict] = None
 ):
+    """
+    Store a selection together with one selection_participants row per participant.
+    weight_changes holds the weights after the draw, weights_before those before it.
+    """
+    weights_before = weights_before or {}
     db_selection = db_models.Selection(
         chosen_user_id=selection.chosen_user_id,
         record_id=selection.record_id,
         user_id=user_id,
         participants=selection.participants,
-        weight_changes=json.dumps(weight_changes)
+        weight_changes=json.dumps(weight_changes),
+        participant_entries=[
+            db_models.SelectionParticipant(
+                user_id=participant_id,
+                weight_before=weights_before.get(participant_id),
+                weight_after=weight_changes.get(participant_id)
+            )
+            for participant_id in parse_participants(selection.participants)
+        ]
     )
     db.add(db_selection)
-    db.commit()
-    db.refresh(db_selection)
+    if commit:
+        generation = bump_selection_stats_generation(db)
+        db.commit()
+        db.refresh(db_selection)
+        selection_stats.add_selections([
+            (db_selection.user_id, db_selection.chosen_user_id, db_selection.record_id)
+        ], generation)
     return db_selection
 
 
 # Selection logic
+MAX_POINTS_PER_DRAW = 5
+MAX_DRAW_ATTEMPTS = 5
+DRAW_RETRY_BACKOFF = 0.05  # seconds
+
+
+class SelectionConflictError(Exception):
+    """Raised when a draw collides with a concurrent draw on the same users or records"""
+
+
+class UnknownParticipantError(Exception):
+    """Raised when a participant ID doesn't belong to any user"""
+
+
+def _is_lock_error(error: OperationalError) -> bool:
+    """Whether the database rejected the write because another transaction holds the lock"""
+    message = str(error.orig).lower()
+    return "locked" in message or "busy" in message
+
+
+def calculate_new_weights(weights: dict, chosen_user_id: int) -> dict:
+    """
+    Redistribute points after a draw: every other participant gains up to
+    MAX_POINTS_PER_DRAW points and the chosen user loses the sum of what the others gained.
+    Takes and returns a {user_id: weight} mapping.
+    """
+    participants_count = len(weights)
+    
+    # How many points to redistribute
+    points_to_add = min(MAX_POINTS_PER_DRAW, weights[chosen_user_id] // participants_count)
+    
+    new_weights = {}
+    for participant_id, weight in weights.items():
+        if participant_id == chosen_user_id:
+            # Chosen user loses points
+            new_weights[participant_id] = weight - (points_to_add * (participants_count - 1))
+        else:
+            # Others gain points
+            new_weights[participant_id] = weight + points_to_add
+    return new_weights
+
+
+def get_selection_candidates(db: Session, participant_ids: List[int]):
+    """
+    Get every participant together with the IDs of their unused records.
+    Uses a single grouped query (LEFT JOIN on unused records), so the cost is
+    one round trip regardless of the number of participants.
+    Returns a list of (user, record_ids) tuples; record_ids is empty for users
+    without unused records.
+    """
+    record_ids = func.aggregate_strings(cast(db_models.Record.id, String), ",")
+    rows = db.query(db_models.User, record_ids).outerjoin(
+        db_models.Record,
+        and_(
+            db_models.Record.owner_id == db_models.User.id,
+            db_models.Record.used == False
+        )
+    ).filter(
+        db_models.User.id.in_(participant_ids)
+    ).group_by(db_models.User.id).all()
+    
+    return [
+        (user, [int(record_id) for record_id in ids.split(",")] if ids else [])
+        for user, ids in rows
+    ]
+
+
+def check_participants_exist(candidates, participant_ids: List[int]):
+    """Raise UnknownParticipantError for the first participant missing from get_selection_candidates' result"""
+    found_ids = {user.id for user, _ in candidates}
+    for participant_id in participant_ids:
+        if participant_id not in found_ids:
+            raise UnknownParticipantError(f"User with ID {participant_id} not found")
+
+
 def choose_record_and_update_weights(
     db: Session, 
     participant_ids: List[int],
     user_id: int
 ) -> models.SelectionResult:
     """Choose a random record based on weights and update the weights accordingly"""
+    return choose_records_and_update_weights(db, participant_ids, user_id, rounds=1)[0]
+
+
+def choose_records_and_update_weights(
+    db: Session, 
+    participant_ids: List[int],
+    user_id: int,
+    rounds: int
+) -> List[models.SelectionResult]:
+    """
+    Perform `rounds` sequential draws, applying the weight updates in between,
+    and store them all in one transaction.
+    The whole batch is retried (with a short random backoff) when a concurrent
+    draw changed the same users or records in the meantime.
+    """
+    for attempt in range(MAX_DRAW_ATTEMPTS):
+        try:
+            return _choose_records_and_update_weights(db, participant_ids, user_id, rounds)
+        except (SelectionConflictError, OperationalError) as e:
+            db.rollback()
+            if isinstance(e, OperationalError) and not _is_lock_error(e):
+                raise
+            time.sleep(random.uniform(0, DRAW_RETRY_BACKOFF * (attempt + 1)))
     
-    # Get all participants (users)
-    participants = db.query(db_models.User).filter(
-        db_models.User.id.in_(participant_ids)
-    ).all()
+    raise SelectionConflictError(
+        f"Selection failed after {MAX_DRAW_ATTEMPTS} attempts because of concurrent selections, please try again"
+    )
+
+
+def _choose_records_and_update_weights(
+    db: Session, 
+    participant_ids: List[int],
+    user_id: int,
+    rounds: int
+) -> List[models.SelectionResult]:
+    """Perform a single optimistic attempt at a batch of draws"""
     
-    if not participants:
+    # Eligibility, weights and candidate records for every participant in one round trip
+    candidates = get_selection_candidates(db, participant_ids)
+    check_participants_exist(candidates, participant_ids)
+    
+    if not candidates:
         raise ValueError("No participants found")
     
-    # Filter out participants who don't have any unused records
-    valid_participants = []
-    valid_weights = []
+    participants = [user for user, _ in candidates]
+    usernames = {user.id: user.username for user in participants}
+    versions = {user.id: user.version for user in participants}
+    weights = {user.id: user.weight for user in participants}
+    available_records = {user.id: list(record_ids) for user, record_ids in candidates}
     
-    for user in participants:
-        # Count unused records for this user
-        record_count = db.query(db_models.Record).filter(
-            db_models.Record.owner_id == user.id,
-            db_models.Record.used == False
-        ).count()
+    draws = []
+    for draw_number in range(rounds):
+        # Filter out participants who don't have any unused records left
+        valid_ids = [user.id for user in participants if available_records[user.id]]
         
-        if record_count > 0:
-            valid_participants.append(user)
-            valid_weights.append(user.weight)
-    
-    if not valid_participants:
-        raise ValueError("None of the selected users have unused records available")
-    
-    # Choose user based on weights
-    chosen_user = random.choices(valid_participants, weights=valid_weights, k=1)[0]
-    
-    # Get unused records belonging to the chosen user
-    user_records = db.query(db_models.Record).filter(
-        db_models.Record.owner_id == chosen_user.id,
-        db_models.Record.used == False
-    ).all()
-    
-    if not user_records:
-        raise ValueError(f"No unused records found for user {chosen_user.username}")
+        if not valid_ids:
+            if draw_number == 0:
+                raise ValueError("None of the selected users have unused records available")
+            raise ValueError(f"Only {draw_number} of {rounds} selections possible, the selected users ran out of unused records")
+        
+        # Choose user based on weights
+        sampler = get_sampler(valid_ids, [weights[uid] for uid in valid_ids])
+        chosen_user_id = sampler.draw()
+        
+        # Choose a random record from the user's available unused records
+        user_records = available_records[chosen_user_id]
+        chosen_record_id = user_records.pop(random.randrange(len(user_records)))
+        
+        # Calculate new weights
+        weights_before = weights
+        weights = calculate_new_weights(weights, chosen_user_id)
+        draws.append((chosen_user_id, chosen_record_id, weights_before, weights))
     
-    # Choose a random record from the user's available unused records
-    chosen_record = random.choice(user_records)
+    chosen_records = {
+        record.id: record
+        for record in db.query(db_models.Record).filter(
+            db_models.Record.id.in_([record_id for _, record_id, _, _ in draws])
+        )
+    }
     
-    # Mark the record as used
-    chosen_record.used = True
-    db.commit()
+    # Build the results before committing so they don't reload expired rows
+    results = [
+        models.SelectionResult(
+            chosen_username=usernames[chosen_user_id],
+            chosen_record=f"{chosen_records[record_id].artist} - {chosen_records[record_id].title}",
+            new_weights=[weight_changes[user_id] for user_id in participant_ids],
+            timestamp=datetime.datetime.utcnow()
+        )
+        for chosen_user_id, record_id, _, weight_changes in draws
+    ]
     
-    # Calculate new weights
-    weight_changes = {}
-    participants_count = len(participants)
+    # Apply all draws as one transaction: mark the records as used,
+    # update all weights with one statement and store the selections.
+    # Both updates only match rows that are unchanged since they were read.
+    try:
+        records_marked = db.query(db_models.Record).filter(
+            db_models.Record.id.in_(chosen_records.keys()),
+            db_models.Record.used == False
+        ).update({db_models.Record.used: True}, synchronize_session=False)
+        if records_marked != len(draws):
+            raise SelectionConflictError("A record was already used by a concurrent selection")
+        
+        users_updated = update_user_weights(db, weights, versions)
+        if users_updated != len(participants):
+            raise SelectionConflictError("User weights were changed by a concurrent selection")
+        
+        db_selections = []
+        for chosen_user_id, record_id, weights_before, weight_changes in draws:
+            selection = models.SelectionCreate(
+                chosen_user_id=chosen_user_id,
+                record_id=record_id,
+                participants=",".join(map(str, participant_ids))
+            )
+            db_selections.append(create_selection(
+                db, selection, user_id, weight_changes, commit=False, weights_before=weights_before
+            ))
+        new_selections = [
+            (s.user_id, s.chosen_user_id, s.record_id) for s in db_selections
+        ]
+        generation = bump_selection_stats_generation(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     
-    # How many points to redistribute
-    points_to_add = min(5, chosen_user.weight // participants_count)
+    selection_stats.add_selections(new_selections, generation)
     
-    # Update weights
-    for user in participants:
-        if user.id == chosen_user.id:
-            # Chosen user loses points
-            new_weight = user.weight - (points_to_add * (participants_count - 1))
-            weight_changes[user.id] = new_weight
-            update_user_weight(db, user.id, new_weight)
-        else:
-            # Others gain points
-            new_weight = user.weight + points_to_add
-            weight_changes[user.id] = new_weight
-            update_user_weight(db, user.id, new_weight)
-    
-    # Create selection record
-    selection = models.SelectionCreate(
-        chosen_user_id=chosen_user.id,
-        record_id=chosen_record.id,
-        participants=",".join(map(str, participant_ids))
-    )
-    create_selection(db, selection, user_id, weight_changes)
-    
-    # Return selection result
-    return models.SelectionResult(
-        chosen_username=chosen_user.username,
-        chosen_record=f"{chosen_record.artist} - {chosen_record.title}",
-        new_weights=[weight_changes[user_id] for user_id in participant_ids],
-        timestamp=datetime.datetime.utcnow()
-    )
+    return results
 
 
 # Statistics
-def get_selection_stats(db: Session, user_id: Optional[int] = None) -> models.SelectionStats:
-    """Get statistics about selections, optionally filtered by user"""
-    # Get selections
-    query = db.query(db_models.Selection)
-    if user_id:
-        query = query.filter(db_models.Selection.user_id == user_id)
+def bump_selection_stats_generation(db: Session) -> int:
+    """
+    Increment the selection stats generation and return the new value.
+    Call it in every transaction that adds or changes selections, before committing.
+    """
+    table = db_models.SelectionStatsGeneration.__table__
+    statement = _insert_for_dialect(db, table).values(id=1, generation=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={"generation": table.c.generation + 1}
+    ).returning(table.c.generation)
+    return db.execute(statement).scalar_one()
+
+
+def get_selection_stats_generation(db: Session) -> int:
+    """Current selection stats generation, a single primary key lookup"""
+    return db.query(db_models.SelectionStatsGeneration.generation).filter(
+        db_models.SelectionStatsGeneration.id == 1
+    ).scalar() or 0
+
+
+def _count_selections(db: Session, user_id: Optional[int] = None) -> SelectionCounts:
+    """Count selections per chosen user and per record with GROUP BY queries"""
+    def grouped_counts(column):
+        query = db.query(column, func.count(db_models.Selection.id))
+        if user_id:
+            query = query.filter(db_models.Selection.user_id == user_id)
+        return Counter(dict(query.group_by(column).all()))
     
-    selections = query.all()
-    total_selections = len(selections)
+    user_counts = grouped_counts(db_models.Selection.chosen_user_id)
+    record_counts = grouped_counts(db_models.Selection.record_id)
+    return SelectionCounts(sum(user_counts.values()), user_counts, record_counts)
+
+
+def get_selection_stats(db: Session, user_id: Optional[int] = None) -> models.SelectionStats:
+    """
+    Get statistics about selections, optionally filtered by user.
+    Counts come from the in-process stats store and are recomputed with
+    GROUP BY queries only when the store has no valid entry.
+    """
+    scope = user_id or None
+    generation = get_selection_stats_generation(db)
+    counts = selection_stats.get(scope, generation)
+    if counts is None:
+        counts = _count_selections(db, user_id)
+        # Only cache counts no selection was committed during
+        if get_selection_stats_generation(db) == generation:
+            selection_stats.put(scope, generation, counts)
     
-    # User distribution
-    user_counts = {}
-    user_map = {u.id: u.username for u in db.query(db_models.User).all()}
+    total_selections = counts.total
     
-    # Record distribution
-    record_counts = {}
+    # Resolve names only for users and records that were actually selected
+    user_map = dict(db.query(db_models.User.id, db_models.User.username).filter(
+        db_models.User.id.in_([uid for uid in counts.user_counts if uid is not None])
+    ).all())
     record_map = {
-        r.id: f"{r.artist} - {r.title}" 
-        for r in db.query(db_models.Record).all()
+        record_id: f"{artist} - {title}"
+        for record_id, artist, title in db.query(
+            db_models.Record.id, db_models.Record.artist, db_models.Record.title
+        ).filter(
+            db_models.Record.id.in_([rid for rid in counts.record_counts if rid is not None])
+        ).all()
     }
     
-    # Count selections
-    for selection in selections:
-        # Count by user
-        user_name = user_map.get(selection.chosen_user_id, "Unknown")
-        if user_name in user_counts:
-            user_counts[user_name] += 1
-        else:
-            user_counts[user_name] = 1
-            
-        # Count by record
-        record_name = record_map.get(selection.record_id, "Unknown")
-        if record_name in record_counts:
-            record_counts[record_name] += 1
-        else:
-            record_counts[record_name] = 1
+    # Count by user and by record name
+    user_counts = Counter()
+    for chosen_user_id, count in counts.user_counts.items():
+        user_counts[user_map.get(chosen_user_id, "Unknown")] += count
+    
+    record_counts = Counter()
+    for record_id, count in counts.record_counts.items():
+        record_counts[record_map.get(record_id, "Unknown")] += count
     
     # Calculate percentages for users
     user_distribution = {
@@ -447,6 +1121,211 @@ def get_selection_stats(db: Session, user_id: Optional[int] = None) -> models.Se
     )
 
 
+# Analytics
+def _month_bucket(db: Session, column):
+    """SQL expression formatting a timestamp as YYYY-MM"""
+    if db.get_bind().dialect.name == "sqlite":
+        return func.strftime("%Y-%m", column)
+    return func.to_char(column, "YYYY-MM")
+
+
+def get_monthly_selections(db: Session) -> List[models.MonthlySelections]:
+    """Number of selections and their average rating per month"""
+    month = _month_bucket(db, db_models.Selection.timestamp)
+    rows = db.query(
+        month.label("month"),
+        func.count(db_models.Selection.id),
+        func.sum(db_models.Selection.rating_sum),
+        func.sum(db_models.Selection.rating_count)
+    ).filter(
+        db_models.Selection.timestamp != None
+    ).group_by(month).order_by(month).all()
+    
+    return [
+        models.MonthlySelections(
+            month=month_label,
+            selections=selections,
+            average_rating=rating_sum / rating_count if rating_count else None
+        )
+        for month_label, selections, rating_sum, rating_count in rows
+    ]
+
+
+def get_rolling_ratings(
+    db: Session,
+    window: int = 5,
+    since: Optional[datetime.datetime] = None
+) -> List[models.RollingRating]:
+    """
+    Rolling average rating of the last `window` rated selections of every chooser,
+    computed with a window function. Only points from `since` on are returned,
+    but their averages still include the earlier selections in the window.
+    """
+    average_rating = db_models.Selection.rating_sum / db_models.Selection.rating_count
+    rolling_average = func.avg(average_rating).over(
+        partition_by=db_models.Selection.chosen_user_id,
+        order_by=(db_models.Selection.timestamp, db_models.Selection.id),
+        rows=(-(window - 1), 0)
+    )
+    points = db.query(
+        db_models.Selection.chosen_user_id.label("chosen_user_id"),
+        db_models.Selection.id.label("selection_id"),
+        db_models.Selection.timestamp.label("timestamp"),
+        rolling_average.label("rolling_average_rating")
+    ).filter(
+        db_models.Selection.chosen_user_id != None,
+        db_models.Selection.timestamp != None,
+        db_models.Selection.rating_count > 0
+    ).subquery()
+    
+    query = db.query(
+        points.c.chosen_user_id,
+        db_models.User.username,
+        points.c.selection_id,
+        points.c.timestamp,
+        points.c.rolling_average_rating
+    ).outerjoin(
+        db_models.User, db_models.User.id == points.c.chosen_user_id
+    )
+    if since is not None:
+        if since.tzinfo is not None and db.get_bind().dialect.name == "sqlite":
+            # SQLite stores timestamps as naive UTC
+            since = since.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        query = query.filter(
+            _timestamp_sort_key(db, points.c.timestamp) >= _timestamp_sort_key(db, literal(since, DateTime(timezone=True)))
+        )
+    rows = query.order_by(
+        points.c.chosen_user_id, points.c.timestamp, points.c.selection_id
+    ).all()
+    
+    return [
+        models.RollingRating(
+            chosen_user_id=chosen_user_id,
+            chosen_username=username,
+            selection_id=selection_id,
+            timestamp=timestamp,
+            rolling_average_rating=rolling_average_rating
+        )
+        for chosen_user_id, username, selection_id, timestamp, rolling_average_rating in rows
+    ]
+
+
+def get_last_picked(db: Session) -> List[models.UserLastPicked]:
+    """How many times every user was picked and how long ago the last time was"""
+    picks = db.query(
+        db_models.Selection.chosen_user_id.label("user_id"),
+        func.count(db_models.Selection.id).label("times_picked"),
+        func.max(db_models.Selection.timestamp).label("last_picked")
+    ).group_by(db_models.Selection.chosen_user_id).subquery()
+    
+    rows = db.query(
+        db_models.User.id,
+        db_models.User.username,
+        func.coalesce(picks.c.times_picked, 0),
+        picks.c.last_picked
+    ).outerjoin(
+        picks, picks.c.user_id == db_models.User.id
+    ).order_by(db_models.User.id).all()
+    
+    now = datetime.datetime.now(datetime.timezone.utc)
+    result = []
+    for user_id, username, times_picked, last_picked in rows:
+        days_since = None
+        if last_picked is not None:
+            if last_picked.tzinfo is None:
+                # SQLite returns naive timestamps in UTC
+                last_picked = last_picked.replace(tzinfo=datetime.timezone.utc)
+            days_since = (now - last_picked).total_seconds() / 86400
+        result.append(models.UserLastPicked(
+            user_id=user_id,
+            username=username,
+            times_picked=times_picked,
+            last_picked=last_picked,
+            days_since_last_picked=days_since
+        ))
+    return result
+
+
+def get_weight_trajectory(db: Session, user_id: int) -> List[models.WeightPoint]:
+    """A user's weight after every selection they took part in"""
+    rows = db.query(
+        db_models.Selection.id, db_models.Selection.timestamp, db_models.SelectionParticipant.weight_after
+    ).join(
+        db_models.SelectionParticipant, db_models.SelectionParticipant.selection_id == db_models.Selection.id
+    ).filter(
+        db_models.SelectionParticipant.user_id == user_id,
+        db_models.SelectionParticipant.weight_after != None,
+        db_models.Selection.timestamp != None
+    ).order_by(db_models.Selection.timestamp, db_models.Selection.id).all()
+    
+    return [
+        models.WeightPoint(selection_id=selection_id, timestamp=timestamp, weight=user_weight)
+        for selection_id, timestamp, user_weight in rows
+    ]
+
+
+# Attendance
+def get_user_attendance(
+    db: Session,
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[dict] = None
+) -> List[models.Attendance]:
+    """
+    Selections a user took part in, newest first, with their weight around each draw.
+    Raises ValueError if `after` is not a cursor of this listing.
+    """
+    if after is not None:
+        check_cursor_sort(after, "timestamp")
+    key = _timestamp_sort_key(db, db_models.Selection.timestamp)
+    query = db.query(
+        db_models.Selection.id,
+        db_models.Selection.timestamp,
+        db_models.Selection.chosen_user_id,
+        db_models.Selection.record_id,
+        db_models.SelectionParticipant.weight_before,
+        db_models.SelectionParticipant.weight_after,
+        key
+    ).join(
+        db_models.SelectionParticipant, db_models.SelectionParticipant.selection_id == db_models.Selection.id
+    ).filter(
+        db_models.SelectionParticipant.user_id == user_id
+    ).order_by(key.desc(), db_models.Selection.id.desc())
+    
+    if after is not None:
+        query = query.filter(after_keyset(key, db_models.Selection.id, after["key"], after["id"]))
+    
+    rows = query.offset(skip).limit(limit).all()
+    return [
+        models.Attendance(
+            selection_id=selection_id,
+            timestamp=timestamp,
+            chosen_user_id=chosen_user_id,
+            record_id=record_id,
+            weight_before=weight_before,
+            weight_after=weight_after,
+            cursor=encode_cursor({"sort": "timestamp", "key": sort_key, "id": selection_id})
+        )
+        for selection_id, timestamp, chosen_user_id, record_id, weight_before, weight_after, sort_key in rows
+    ]
+
+
+def get_user_weight_at(db: Session, user_id: int, at: datetime.datetime) -> Optional[float]:
+    """A user's weight right after the last selection they took part in at or before `at`"""
+    if at.tzinfo is not None and db.get_bind().dialect.name == "sqlite":
+        # SQLite stores timestamps as naive UTC
+        at = at.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    key = _timestamp_sort_key(db, db_models.Selection.timestamp)
+    return db.query(db_models.SelectionParticipant.weight_after).join(
+        db_models.Selection, db_models.Selection.id == db_models.SelectionParticipant.selection_id
+    ).filter(
+        db_models.SelectionParticipant.user_id == user_id,
+        db_models.SelectionParticipant.weight_after != None,
+        key <= _timestamp_sort_key(db, literal(at, DateTime(timezone=True)))
+    ).order_by(key.desc(), db_models.Selection.id.desc()).limit(1).scalar()
+
+
 # Get all users with weights for selection UI
 def get_users_for_selection(db: Session, skip: int = 0, limit: int = 100) -> List[models.ParticipantUser]:
     users = db.query(db_models.User).offset(skip).limit(limit).all()
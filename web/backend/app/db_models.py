@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Float, DateTime, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Float, DateTime, Text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import datetime
@@ -18,10 +18,16 @@ class User(Base):
     
     # Add weight for selection algorithm (previously in Person entity)
     weight = Column(Float, default=100.0)
+    
+    # Optimistic lock: bumped on every write so concurrent draws can't lose weight updates
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     # Relationships
     records = relationship("Record", back_populates="owner")
     selections_as_chosen = relationship("Selection", foreign_keys="Selection.chosen_user_id", back_populates="chosen_user")
+    refresh_tokens = relationship("RefreshToken", back_populates="user", cascade="all, delete-orphan")
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 class Record(Base):
@@ -43,22 +49,68 @@ class Record(Base):
     owner = relationship("User", back_populates="records")
     selections = relationship("Selection", back_populates="record")
 
+    __table_args__ = (
+        # Unused records of one owner, filtered on every draw and record listing
+        Index("ix_records_owner_id_used", "owner_id", "used"),
+    )
+
 
 class Selection(Base):
     __tablename__ = "selections"
 
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    chosen_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    chosen_user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
     record_id = Column(Integer, ForeignKey("records.id"), nullable=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True) # The user who initiated the selection
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True) # The user who initiated the selection
+    # Denormalized copies of participant_entries, kept for API compatibility
     participants = Column(String, nullable=True) # Comma-separated list of user IDs who participated
     weight_changes = Column(String, nullable=True) # JSON string of weight changes
+    
+    # Rating aggregates, kept up to date by crud.create_rating
+    rating_sum = Column(Float, nullable=False, default=0.0, server_default="0")
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     chosen_user = relationship("User", foreign_keys=[chosen_user_id])
     record = relationship("Record")
     selector = relationship("User", foreign_keys=[user_id])
     ratings = relationship("Rating", back_populates="selection", cascade="all, delete-orphan")
+    participant_entries = relationship("SelectionParticipant", back_populates="selection", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # crud._timestamp_sort_key orders by julianday(timestamp) on SQLite
+        Index("ix_selections_timestamp_julianday", func.julianday(timestamp)).ddl_if(dialect="sqlite"),
+    )
+
+
+class SelectionStatsGeneration(Base):
+    """
+    Single row counter bumped in every transaction that adds or changes selections,
+    so cached selection stats can be validated with one primary key lookup
+    """
+    __tablename__ = "selection_stats_generation"
+
+    id = Column(Integer, primary_key=True)  # Always 1
+    generation = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class SelectionParticipant(Base):
+    __tablename__ = "selection_participants"
+
+    selection_id = Column(Integer, ForeignKey("selections.id"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    
+    # Weights around the draw; unknown for historical imports
+    weight_before = Column(Float, nullable=True)
+    weight_after = Column(Float, nullable=True)
+
+    selection = relationship("Selection", back_populates="participant_entries")
+    user = relationship("User")
+
+    __table_args__ = (
+        # Attendance and weight history of one user
+        Index("ix_selection_participants_user_id_selection_id", "user_id", "selection_id"),
+    )
 
 
 class Rating(Base):
@@ -71,4 +123,39 @@ class Rating(Base):
     selection_id = Column(Integer, ForeignKey("selections.id"), nullable=False)
 
     user = relationship("User")
-    selection = relationship("Selection", back_populates="ratings") 
\ No newline at end of file
+    selection = relationship("Selection", back_populates="ratings")
+
+    __table_args__ = (
+        # One rating per user and selection
+        Index("ix_ratings_selection_id_user_id", "selection_id", "user_id", unique=True),
+    ) 
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String, nullable=False, unique=True, index=True)  # SHA-256 of the token, never the token itself
+    family_id = Column(String, nullable=False, index=True)  # Shared by all tokens rotated from one login
+    created_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)  # Set when rotated or logged out
+
+    user = relationship("User", back_populates="refresh_tokens")
+
+
+class AlbumMetadata(Base):
+    """Cached result of an album lookup on RateYourMusic, MusicBrainz or Discogs"""
+    __tablename__ = "album_metadata"
+
+    id = Column(Integer, primary_key=True, index=True)
+    lookup_key = Column(String, nullable=False, unique=True, index=True)  # See album_metadata.rym_url_key/artist_title_key
+    found = Column(Boolean, nullable=False, default=True)  # False caches that no source knew the album
+    title = Column(String, nullable=True)
+    artist = Column(String, nullable=True)
+    cover_url = Column(String, nullable=True)
+    rym_url = Column(String, nullable=True)
+    source = Column(String, nullable=True)  # rym, musicbrainz or discogs
+    fetched_at = Column(DateTime, nullable=False, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
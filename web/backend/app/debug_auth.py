@@ -2,7 +2,6 @@
 import os
 import sys
 import getpass
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Add backend directory to sys.path
@@ -10,11 +9,11 @@ BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(os.path.dirname(BACKEND_DIR)) # Add parent directory (where app lives)
 
 from app.db_models import User
-from app.database import SQLALCHEMY_DATABASE_URL
+from app.database import create_db_engine
 from app.utils import verify_password
 
 # Create engine and session
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_db_engine(pooled=False)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 def test_auth(username, password):
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException, Request, Form, APIRouter
+from fastapi import FastAPI, Depends, HTTPException, Request, Form, APIRouter, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 import uvicorn
@@ -6,6 +6,9 @@ import uvicorn
 from . import models, db_models, crud, auth, api
 from .database import engine, SessionLocal, get_db
 from .auth import get_current_admin_user # Import the admin check dependency
+from .pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from .principals import principal_cache
+from .stats import selection_stats
 
 # Create database tables if they don't exist (Not needed if using Alembic consistently)
 # db_models.Base.metadata.create_all(bind=engine)
@@ -29,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER],
 )
 
 # --- Admin API Router ---
@@ -36,11 +40,13 @@ from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
 import os
 
+# Admin handlers are plain `def`: they use the blocking Session, so FastAPI
+# runs them in its threadpool instead of on the event loop
 admin_router = APIRouter(prefix="/admin", tags=["Admin"])
 
 # Create simple admin API endpoints secured by admin dependency
 @admin_router.get("/", response_class=HTMLResponse)
-async def admin_dashboard(
+def admin_dashboard(
     request: Request,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -81,7 +87,7 @@ async def admin_dashboard(
     """
 
 @admin_router.get("/users", response_class=HTMLResponse)
-async def list_users(
+def list_users(
     request: Request,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -218,7 +224,7 @@ async def list_users(
     """
 
 @admin_router.get("/users/new", response_class=HTMLResponse)
-async def new_user_form(
+def new_user_form(
     request: Request,
     current_user: models.User = Depends(get_current_admin_user)
 ):
@@ -338,7 +344,7 @@ async def new_user_form(
     """
 
 @admin_router.post("/users/new", response_class=HTMLResponse)
-async def create_user(
+def create_user(
     request: Request,
     username: str = Form(...),
     email: str = Form(...),
@@ -423,7 +429,7 @@ async def create_user(
     """
 
 @admin_router.get("/users/{user_id}/edit", response_class=HTMLResponse)
-async def edit_user_form(
+def edit_user_form(
     user_id: int,
     request: Request,
     current_user: models.User = Depends(get_current_admin_user),
@@ -567,7 +573,7 @@ async def edit_user_form(
     """
 
 @admin_router.post("/users/{user_id}/update", response_class=HTMLResponse)
-async def update_user(
+def update_user(
     user_id: int,
     request: Request,
     username: str = Form(...),
@@ -655,6 +661,9 @@ async def update_user(
     user.is_active = is_active
     user.is_admin = is_admin
     db.commit()
+    principal_cache.invalidate(user_id)
+    if password or not is_active:
+        crud.revoke_user_refresh_tokens(db, user_id)
     
     # Redirect to user list
     return f"""
@@ -677,7 +686,7 @@ async def update_user(
     """
 
 @admin_router.delete("/users/{user_id}/delete")
-async def delete_user(
+def delete_user(
     user_id: int,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -692,13 +701,16 @@ async def delete_user(
         raise HTTPException(status_code=400, detail="Cannot delete your own account")
     
     # Delete user
+    # Deleting a user clears them from the selections they were chosen in
     db.delete(user)
+    crud.bump_selection_stats_generation(db)
     db.commit()
+    principal_cache.invalidate(user_id)
     
     return {"success": True}
 
 @admin_router.get("/records", response_class=HTMLResponse)
-async def list_records(
+def list_records(
     request: Request,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -765,28 +777,28 @@ async def list_records(
     """
 
 @admin_router.get("/selections", response_class=HTMLResponse)
-async def list_selections(
+def list_selections(
     request: Request,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    selections = crud.get_selection_history(db)
+    # Selections with their users and records in one joined query
+    selections = crud.get_admin_selections(db)
     selections_html = ""
     
     for selection in selections:
-        # Get related objects
-        chosen_user = db.query(db_models.User).filter(db_models.User.id == selection.chosen_user_id).first()
-        record = db.query(db_models.Record).filter(db_models.Record.id == selection.record_id).first()
-        selector = db.query(db_models.User).filter(db_models.User.id == selection.user_id).first()
+        chosen_user = selection["chosen_user"]
+        record = selection["record"]
+        selector = selection["selector"]
         
         selections_html += f"""
         <tr>
-            <td>{selection.id}</td>
-            <td>{selection.timestamp}</td>
-            <td>{chosen_user.username if chosen_user else 'Unknown'}</td>
-            <td>{f"{record.artist} - {record.title}" if record else 'Unknown'}</td>
-            <td>{selector.username if selector else 'Unknown'}</td>
-            <td>{selection.participants}</td>
+            <td>{selection["id"]}</td>
+            <td>{selection["timestamp"]}</td>
+            <td>{chosen_user["username"] if chosen_user else 'Unknown'}</td>
+            <td>{f"{record['artist']} - {record['title']}" if record else 'Unknown'}</td>
+            <td>{selector["username"] if selector else 'Unknown'}</td>
+            <td>{selection["participants"]}</td>
         </tr>
         """
     
@@ -882,14 +894,14 @@ class AdminRatingCreate(BaseModel):
 # <<< END NEW MODELS FOR HISTORICAL DATA >>>
 
 @admin_router.get("/users/api", response_model=list[models.User])
-async def api_list_users(
+def api_list_users(
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     return crud.get_users(db)
 
 @admin_router.post("/users/api", response_model=models.User, status_code=status.HTTP_201_CREATED)
-async def api_create_user(
+def api_create_user(
     user_data: UserCreate,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -927,7 +939,7 @@ async def api_create_user(
     return new_user
 
 @admin_router.get("/users/api/{user_id}", response_model=models.User)
-async def api_get_user(
+def api_get_user(
     user_id: int,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -941,7 +953,7 @@ async def api_get_user(
     return user
 
 @admin_router.put("/users/api/{user_id}", response_model=models.User)
-async def api_update_user(
+def api_update_user(
     user_id: int,
     user_data: UserUpdate,
     current_user: models.User = Depends(get_current_admin_user),
@@ -981,12 +993,15 @@ async def api_update_user(
     user.is_active = user_data.is_active
     user.is_admin = user_data.is_admin
     db.commit()
+    principal_cache.invalidate(user_id)
+    if user_data.password or not user_data.is_active:
+        crud.revoke_user_refresh_tokens(db, user_id)
     db.refresh(user)
     
     return user
 
 @admin_router.delete("/users/api/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def api_delete_user(
+def api_delete_user(
     user_id: int,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -1007,54 +1022,29 @@ async def api_delete_user(
         )
     
     # Delete user
+    # Deleting a user clears them from the selections they were chosen in
     db.delete(user)
+    crud.bump_selection_stats_generation(db)
     db.commit()
+    principal_cache.invalidate(user_id)
     
     return None
 
 # Add REST API endpoints for admin selections
 @admin_router.get("/selections/api", response_model=list[dict])
-async def api_list_selections(
+def api_list_selections(
     sort_by_rating: bool = False,
+    skip: int = 0,
+    limit: int = 100,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
-    selection_history = crud.get_selection_history(db, sort_by_rating=sort_by_rating)
-    result = []
-    
-    for selection in selection_history:
-        # Get related objects
-        chosen_user = db.query(db_models.User).filter(db_models.User.id == selection.chosen_user_id).first() if selection.chosen_user_id else None
-        record = db.query(db_models.Record).filter(db_models.Record.id == selection.record_id).first() if selection.record_id else None
-        selector = db.query(db_models.User).filter(db_models.User.id == selection.user_id).first() if selection.user_id else None
-        
-        selection_dict = {
-            "id": selection.id,
-            "timestamp": selection.timestamp,
-            "chosen_user": {
-                "id": chosen_user.id,
-                "username": chosen_user.username
-            } if chosen_user else None,
-            "record": {
-                "id": record.id,
-                "title": record.title,
-                "artist": record.artist
-            } if record else None,
-            "selector": {
-                "id": selector.id,
-                "username": selector.username
-            } if selector else None,
-            "participants": selection.participants,
-            "average_rating": selection.average_rating,
-            "ratings_count": len(selection.ratings) if selection.ratings else 0
-        }
-        result.append(selection_dict)
-    
-    return result
+    # Selections with their users, records and rating counts in one joined query
+    return crud.get_admin_selections(db, skip=skip, limit=limit, sort_by_rating=sort_by_rating)
 
 # <<< START NEW ADMIN SELECTION/RATING ENDPOINTS >>>
 @admin_router.post("/selections/api/historical", response_model=models.Selection, status_code=status.HTTP_201_CREATED)
-async def api_create_historical_selection(
+def api_create_historical_selection(
     selection_data: HistoricalSelectionCreate,
     current_admin: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
@@ -1085,12 +1075,20 @@ async def api_create_historical_selection(
         user_id=selection_data.selector_id, # User who ran the selection (e.g., winner)
         participants=participants_str,
         # weight_changes is not set for historical import
+        participant_entries=[
+            db_models.SelectionParticipant(user_id=participant_id)
+            for participant_id in crud.parse_participants(participants_str)
+        ]
     )
 
     try:
         db.add(db_selection)
+        generation = crud.bump_selection_stats_generation(db)
         db.commit()
         db.refresh(db_selection)
+        selection_stats.add_selections([
+            (db_selection.user_id, db_selection.chosen_user_id, db_selection.record_id)
+        ], generation)
         # Manually load relationships for the response model if needed
         # db_selection.chosen_user = db.query(db_models.User).get(db_selection.chosen_user_id)
         # db_selection.record = db.query(db_models.Record).get(db_selection.record_id)
@@ -1104,7 +1102,7 @@ async def api_create_historical_selection(
         )
 
 @admin_router.post("/selections/api/{selection_id}/rate", response_model=models.Rating, status_code=status.HTTP_201_CREATED)
-async def api_admin_rate_selection(
+def api_admin_rate_selection(
     selection_id: int,
     rating_data: AdminRatingCreate,
     current_admin: models.User = Depends(get_current_admin_user),
@@ -1140,7 +1138,8 @@ async def api_admin_rate_selection(
             db=db,
             user_id=rating_data.user_id,
             selection_id=selection_id,
-            rating=rating_data.rating
+            rating=rating_data.rating,
+            user=user
         )
         return created_rating
     except Exception as e:
@@ -1153,32 +1152,42 @@ async def api_admin_rate_selection(
 
 # Add REST API endpoints for admin records
 @admin_router.get("/records/api", response_model=list[dict])
-async def api_list_records(
+def api_list_records(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    owner_id: Optional[int] = None,
+    used: Optional[bool] = None,
+    artist_prefix: Optional[str] = None,
+    sort_by: str = "id",
+    descending: bool = False,
     current_user: models.User = Depends(get_current_admin_user),
     db: Session = Depends(get_db)
 ):
     """
-    Retrieve a list of all records with their owner's name.
+    Retrieve a page of records with their owner's name, optionally filtered by
+    owner, used status and artist prefix. The total number of matching records
+    is returned in the X-Total-Count header.
     """
-    records = crud.get_all_records(db, include_used=True)
-    result = []
-    for record in records:
-        # Fetch owner name separately if needed, or adjust if get_all_records provides it
-        owner = crud.get_user(db, record.owner_id) if record.owner_id else None
-        owner_name = owner.username if owner else "None"
-        result.append({
-            "id": record.id,
-            "title": record.title,
-            "artist": record.artist,
-            "owner_id": record.owner_id,
-            "owner_name": owner_name,
-            "used": record.used,
-        })
-    return result
+    try:
+        records, total = crud.get_admin_records(
+            db,
+            skip=skip,
+            limit=limit,
+            owner_id=owner_id,
+            used=used,
+            artist_prefix=artist_prefix,
+            sort_by=sort_by,
+            descending=descending
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    response.headers[TOTAL_COUNT_HEADER] = str(total)
+    return records
 
 # Added PUT endpoint for updating records
 @admin_router.put("/records/api/{record_id}", response_model=models.Record)
-async def api_update_record(
+def api_update_record(
     record_id: int,
     record_data: RecordUpdate,
     current_user: models.User = Depends(get_current_admin_user),
@@ -23,6 +23,22 @@ class User(UserBase):
         orm_mode = True
 
 
+# Authenticated user, as cached by principals.PrincipalCache
+class Principal(BaseModel):
+    id: int
+    username: str
+    is_active: Optional[bool] = True
+    is_admin: Optional[bool] = False
+
+    class Config:
+        orm_mode = True
+
+
+# Body of /token/refresh and /logout
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+
 # Record models
 class RecordBase(BaseModel):
     title: str
@@ -122,6 +138,24 @@ class SelectionResult(BaseModel):
     
     
 
+# Simulation models
+class UserSimulation(BaseModel):
+    user_id: int
+    username: str
+    current_weight: float
+    expected_selections: float  # Mean number of times chosen over all rounds
+    selection_share: float  # Fraction of rounds in which the user was chosen
+    final_weight: float  # Mean weight after the last round
+
+
+class SimulationResult(BaseModel):
+    rounds: int
+    trials: int
+    users: list[UserSimulation]
+    checkpoint_rounds: list[int]
+    weight_trajectory: list[list[float]]  # Mean weights per checkpoint, in the order of users
+
+
 # Statistics model
 class SelectionStats(BaseModel):
     total_selections: int
@@ -129,6 +163,61 @@ class SelectionStats(BaseModel):
     record_distribution: dict
 
 
+# Analytics models
+class MonthlySelections(BaseModel):
+    month: str  # YYYY-MM
+    selections: int
+    average_rating: Optional[float] = None
+
+
+class RollingRating(BaseModel):
+    chosen_user_id: int
+    chosen_username: Optional[str] = None
+    selection_id: int
+    timestamp: datetime.datetime
+    rolling_average_rating: float
+
+
+class UserLastPicked(BaseModel):
+    user_id: int
+    username: str
+    times_picked: int
+    last_picked: Optional[datetime.datetime] = None
+    days_since_last_picked: Optional[float] = None
+
+
+class WeightPoint(BaseModel):
+    selection_id: int
+    timestamp: datetime.datetime
+    weight: float
+
+
+class SelectionAnalytics(BaseModel):
+    monthly: list[MonthlySelections]
+    rolling_since: datetime.datetime
+    rolling_ratings: list[RollingRating]
+    last_picked: list[UserLastPicked]
+    weight_trajectory_user_id: int
+    weight_trajectory: list[WeightPoint]
+
+
+# Attendance models
+class Attendance(BaseModel):
+    selection_id: int
+    timestamp: Optional[datetime.datetime] = None
+    chosen_user_id: Optional[int] = None
+    record_id: Optional[int] = None
+    weight_before: Optional[float] = None
+    weight_after: Optional[float] = None
+    cursor: str  # Pass as `cursor` to continue after this row
+
+
+class WeightAt(BaseModel):
+    user_id: int
+    at: datetime.datetime
+    weight: Optional[float] = None  # None if the user took part in no selection before `at`
+
+
 # Records List model (for the combined records from all users)
 class AllRecords(RecordBase):
     id: int
@@ -0,0 +1,49 @@
+import base64
+import datetime
+import json
+
+from sqlalchemy import and_, or_
+
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Response header carrying the number of rows matching an offset-paginated listing
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(values: dict) -> str:
+    """Encode the sort key of the last row of a page into an opaque token"""
+    payload = {
+        key: {"dt": value.isoformat()} if isinstance(value, datetime.datetime) else value
+        for key, value in values.items()
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decode a token created by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, dict):
+            raise ValueError
+        return {
+            key: datetime.datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for key, value in payload.items()
+        }
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid pagination cursor")
+
+
+def check_cursor_sort(after: dict, sort: str):
+    """Raise ValueError unless the decoded cursor was issued for the `sort` ordering"""
+    if after.get("sort") != sort:
+        raise ValueError(f"Pagination cursor does not belong to the '{sort}' sort order")
+
+
+def after_keyset(sort_key, id_column, key_value, id_value, id_descending: bool = True):
+    """
+    Filter for rows that come after (key_value, id_value) when ordering by
+    sort_key descending with id_column as the tie-breaker.
+    """
+    id_after = id_column < id_value if id_descending else id_column > id_value
+    return or_(sort_key < key_value, and_(sort_key == key_value, id_after))
@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from . import config, models
+
+
+class PrincipalCache:
+    """
+    In-process TTL + LRU cache of authenticated users, keyed by user ID.
+
+    Entries expire after `ttl` seconds and the least recently used entry is
+    evicted once `max_size` users are cached. The admin routes invalidate a
+    user when they update or delete it; other workers see such changes once
+    their entry expires.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # user_id -> (expires_at, principal)
+
+    def get(self, user_id: int) -> Optional[models.Principal]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, principal = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return principal
+
+    def put(self, principal: models.Principal):
+        if self.ttl <= 0 or self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: Optional[int] = None):
+        """Drop one user, or all of them"""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+principal_cache = PrincipalCache(config.PRINCIPAL_CACHE_TTL, config.PRINCIPAL_CACHE_SIZE)
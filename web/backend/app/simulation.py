@@ -0,0 +1,86 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+RANDOM_BLOCK_ROUNDS = 1024
+
+
+def simulate_selections(
+    weights: Sequence[float],
+    eligible: Sequence[bool],
+    rounds: int,
+    max_points: float,
+    trials: int = 100,
+    checkpoints: int = 50,
+    seed: Optional[int] = None
+) -> dict:
+    """
+    Simulate `rounds` consecutive meetings of the same participants,
+    `trials` times in parallel. Works purely on NumPy arrays without a database
+    session, so nothing is written and stored weights are left untouched.
+
+    Every round applies the same rule as crud.choose_record_and_update_weights:
+    one eligible participant is drawn proportionally to their weight, every other
+    participant gains min(max_points, chosen_weight // participants) points and
+    the chosen one loses what the others gained. Record libraries are assumed
+    not to run out, so eligibility stays fixed.
+
+    Returns a dict with:
+        selection_counts: mean number of times each participant was chosen
+        final_weights: mean weight of each participant after the last round
+        checkpoint_rounds: rounds at which the weights were sampled
+        weight_trajectory: mean weights of each participant at every checkpoint
+    """
+    initial = np.asarray(weights, dtype=np.float64)
+    eligible_mask = np.asarray(eligible, dtype=bool)
+    n = len(initial)
+
+    if n == 0:
+        raise ValueError("No participants found")
+    if not eligible_mask.any():
+        raise ValueError("None of the selected users have unused records available")
+    if initial[eligible_mask].sum() <= 0:
+        raise ValueError("Total weight of eligible participants must be greater than zero")
+
+    rng = np.random.default_rng(seed)
+    current = np.tile(initial, (trials, 1))
+    counts = np.zeros(n, dtype=np.int64)
+    trial_index = np.arange(trials)
+    last_eligible = np.flatnonzero(eligible_mask)[-1]
+
+    step = max(1, rounds // checkpoints)
+    checkpoint_rounds = [0]
+    trajectory = [initial.tolist()]
+
+    masked = np.empty_like(current)
+    cumulative = np.empty_like(current)
+    randoms = np.empty((0, trials))
+
+    for round_number in range(1, rounds + 1):
+        # Random numbers are generated in blocks to keep per-round overhead low
+        block_offset = (round_number - 1) % RANDOM_BLOCK_ROUNDS
+        if block_offset == 0:
+            randoms = rng.random((min(RANDOM_BLOCK_ROUNDS, rounds - round_number + 1), trials))
+
+        # Weighted draw for every trial at once (inverse CDF over eligible weights)
+        np.multiply(current, eligible_mask, out=masked)
+        np.cumsum(masked, axis=1, out=cumulative)
+        targets = randoms[block_offset] * cumulative[:, -1]
+        chosen = np.minimum((cumulative <= targets[:, None]).sum(axis=1), last_eligible)
+        counts += np.bincount(chosen, minlength=n)
+
+        # Redistribute points
+        points = np.minimum(max_points, current[trial_index, chosen] // n)
+        current += points[:, None]
+        current[trial_index, chosen] -= points * n
+
+        if round_number % step == 0 or round_number == rounds:
+            checkpoint_rounds.append(round_number)
+            trajectory.append(current.mean(axis=0).tolist())
+
+    return {
+        "selection_counts": (counts / trials).tolist(),
+        "final_weights": current.mean(axis=0).tolist(),
+        "checkpoint_rounds": checkpoint_rounds,
+        "weight_trajectory": trajectory,
+    }
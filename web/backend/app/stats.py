@@ -0,0 +1,69 @@
+import threading
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+
+class SelectionCounts:
+    """Selection counts for one scope (all selections, or those initiated by one user)"""
+
+    def __init__(self, total: int, user_counts: Counter, record_counts: Counter):
+        self.total = total
+        self.user_counts = user_counts  # chosen_user_id -> count
+        self.record_counts = record_counts  # record_id -> count
+
+
+class SelectionStatsStore:
+    """
+    In-process store of precomputed selection counts.
+
+    Counts are kept per scope (None for all selections, or the ID of the user who
+    initiated them) and updated incrementally when selections are created. Every
+    entry is tied to the generation of the selections table (see
+    db_models.SelectionStatsGeneration), which every transaction that adds or
+    changes selections bumps. When the generation read from the database differs,
+    e.g. because another worker wrote, the store is cleared and the counts are
+    recomputed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation: Optional[int] = None
+        self._entries = {}
+
+    def get(self, scope: Optional[int], generation: int) -> Optional[SelectionCounts]:
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+                return None
+            return self._entries.get(scope)
+
+    def put(self, scope: Optional[int], generation: int, counts: SelectionCounts):
+        with self._lock:
+            if generation == self._generation:
+                self._entries[scope] = counts
+
+    def add_selections(self, selections: Iterable[Tuple[Optional[int], Optional[int], Optional[int]]], generation: int):
+        """
+        Count selections committed as the given generation, given as
+        (selector_id, chosen_user_id, record_id) tuples. Counts are only
+        carried over from the directly preceding generation.
+        """
+        selections = list(selections)
+        with self._lock:
+            if self._generation != generation - 1:
+                self._entries.clear()
+                self._generation = None
+                return
+            for selector_id, chosen_user_id, record_id in selections:
+                for scope in {None, selector_id}:
+                    counts = self._entries.get(scope)
+                    if counts is None:
+                        continue
+                    counts.total += 1
+                    counts.user_counts[chosen_user_id] += 1
+                    counts.record_counts[record_id] += 1
+            self._generation = generation
+
+
+selection_stats = SelectionStatsStore()
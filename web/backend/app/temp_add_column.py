@@ -1,5 +1,5 @@
 #!/usr/bin/env python3
-from sqlalchemy import create_engine, Column, Boolean, text
+from sqlalchemy import Column, Boolean, text
 from sqlalchemy.ext.declarative import declarative_base
 import os
 import sys
@@ -7,11 +7,11 @@ import sys
 # Get the current directory
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.database import SQLALCHEMY_DATABASE_URL
+from app.database import create_db_engine
 from app.db_models import Base
 
 # Create engine
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+engine = create_db_engine(pooled=False)
 
 # Add the column
 with engine.connect() as conn:
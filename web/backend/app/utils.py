@@ -7,12 +7,43 @@ from pydantic import BaseModel
 import requests
 from bs4 import BeautifulSoup
 import re
+import hashlib
 import json
+import secrets
 import time
+from urllib.parse import urlsplit
+
+from . import config
+
+PASSWORD_HASH_SCHEMES = ("bcrypt", "argon2")
+
+
+def create_password_context(scheme: str = None, bcrypt_rounds: int = None) -> CryptContext:
+    """
+    Password context hashing with `scheme` (default: config.PASSWORD_HASH_SCHEME).
+    The other schemes stay verifiable but are deprecated, and bcrypt hashes with a
+    different cost than configured need an update, so they get rehashed on login.
+    """
+    scheme = scheme or config.PASSWORD_HASH_SCHEME
+    if scheme not in PASSWORD_HASH_SCHEMES:
+        raise ValueError(f"Unknown password hash scheme '{scheme}', expected one of: {', '.join(PASSWORD_HASH_SCHEMES)}")
+    rounds = bcrypt_rounds or config.BCRYPT_ROUNDS
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_HASH_SCHEMES if other != scheme],
+        deprecated="auto",
+        # Use a direct ident specification to avoid passlib's automatic detection issues
+        bcrypt__ident="2b",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+        argon2__time_cost=config.ARGON2_TIME_COST,
+        argon2__memory_cost=config.ARGON2_MEMORY_COST,
+        argon2__parallelism=config.ARGON2_PARALLELISM,
+    )
+
 
 # Password hashing
-# Use a direct ident specification to avoid passlib's automatic detection issues
-pwd_context = CryptContext(schemes=["bcrypt"], bcrypt__ident="2b", deprecated="auto")
+pwd_context = create_password_context()
 
 # JWT settings
 SECRET_KEY = os.getenv("SECRET_KEY", "09d25e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7")
@@ -32,6 +63,24 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(plain_password, hashed_password) -> tuple:
+    """
+    Verify a password and return (valid, new_hash). new_hash is set when the
+    stored hash uses an outdated scheme or cost and should be replaced.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def generate_refresh_token() -> str:
+    """A new opaque refresh token"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """Refresh tokens are random, so a fast unsalted hash is enough to store them"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -43,6 +92,23 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def normalize_rym_url(rym_url: str) -> str:
+    """
+    Canonical form of a RateYourMusic release URL (https, no www, lowercase,
+    no query string, trailing slash), so equal albums share one cache entry
+    """
+    parts = urlsplit((rym_url or "").strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[len("www."):]
+    path = parts.path.lower()
+    if parts.scheme.lower() not in ("http", "https") or host != "rateyourmusic.com" or not path.startswith("/release/"):
+        raise ValueError("Invalid RYM URL. Must be a RateYourMusic album URL")
+    if not path.endswith("/"):
+        path += "/"
+    return f"https://rateyourmusic.com{path}"
+
+
 def extract_rym_album_details(rym_url: str) -> dict:
     """
     Extract album details from a RateYourMusic URL
@@ -54,9 +120,9 @@ def extract_rym_album_details(rym_url: str) -> dict:
         dict: Album details including title, artist, and cover_url
     """
     try:
-        # Check if the URL is valid
-        if not rym_url or not rym_url.startswith("https://rateyourmusic.com/release/"):
-            raise ValueError("Invalid RYM URL. Must be a RateYourMusic album URL")
+        # Check if the URL is valid, and fetch it from the configured host
+        rym_url = normalize_rym_url(rym_url)
+        page_url = config.RYM_BASE_URL.rstrip("/") + urlsplit(rym_url).path
         
         # Create a session to maintain cookies
         session = requests.Session()
@@ -78,10 +144,10 @@ def extract_rym_album_details(rym_url: str) -> dict:
         }
         
         # First make a request to the RYM homepage to get cookies
-        session.get("https://rateyourmusic.com/", headers=headers)
+        session.get(config.RYM_BASE_URL.rstrip("/") + "/", headers=headers, timeout=config.ALBUM_LOOKUP_TIMEOUT)
         
         # Then request the album page
-        response = session.get(rym_url, headers=headers)
+        response = session.get(page_url, headers=headers, timeout=config.ALBUM_LOOKUP_TIMEOUT)
         response.raise_for_status()  # Raise exception for HTTP errors
         
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -154,7 +220,7 @@ def get_album_from_musicbrainz(artist_name: str, album_title: str) -> dict:
         query = f'"{album_title}" AND artist:"{artist_name}" AND primarytype:album'
         
         # Set up the API endpoint
-        url = f"https://musicbrainz.org/ws/2/release-group/"
+        url = f"{config.MUSICBRAINZ_BASE_URL.rstrip('/')}/ws/2/release-group/"
         
         # Set headers with a user agent as required by MusicBrainz
         headers = {
@@ -169,7 +235,8 @@ def get_album_from_musicbrainz(artist_name: str, album_title: str) -> dict:
             params={
                 "query": query,
                 "fmt": "json"
-            }
+            },
+            timeout=config.ALBUM_LOOKUP_TIMEOUT
         )
         response.raise_for_status()
         
@@ -187,17 +254,18 @@ def get_album_from_musicbrainz(artist_name: str, album_title: str) -> dict:
         mbid = release_group["id"]
         
         # Respect rate limiting - wait a bit before the next request
-        time.sleep(1)
+        time.sleep(config.MUSICBRAINZ_REQUEST_INTERVAL)
         
         # Get the release to find cover art
-        releases_url = f"https://musicbrainz.org/ws/2/release"
+        releases_url = f"{config.MUSICBRAINZ_BASE_URL.rstrip('/')}/ws/2/release"
         releases_response = requests.get(
             releases_url,
             headers=headers,
             params={
                 "release-group": mbid,
                 "fmt": "json"
-            }
+            },
+            timeout=config.ALBUM_LOOKUP_TIMEOUT
         )
         releases_response.raise_for_status()
         releases_data = releases_response.json()
@@ -284,7 +352,7 @@ def get_album_from_discogs(artist_name: str, album_title: str) -> dict:
         query = f"{artist_name} {album_title}"
         
         # Set up the API endpoint
-        url = "https://api.discogs.com/database/search"
+        url = f"{config.DISCOGS_BASE_URL.rstrip('/')}/database/search"
         
         # Set headers with a user agent as required by Discogs
         headers = {
@@ -300,7 +368,8 @@ def get_album_from_discogs(artist_name: str, album_title: str) -> dict:
                 "q": query,
                 "type": "release",
                 "per_page": 1
-            }
+            },
+            timeout=config.ALBUM_LOOKUP_TIMEOUT
         )
         response.raise_for_status()
         
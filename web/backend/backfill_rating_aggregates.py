@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+import os
+import sys
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BACKEND_DIR)
+
+from app.database import engine
+from app.crud import refresh_rating_aggregates
+
+def backfill_rating_aggregates():
+    """Recompute rating_sum/rating_count of every selection from the ratings table."""
+    print("\n=== Rating Aggregates Backfill ===\n")
+    
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    try:
+        updated = refresh_rating_aggregates(db)
+        print(f"✅ Rating aggregates recomputed for {updated} selections")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error recomputing rating aggregates: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_rating_aggregates()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import os
+import sys
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(BACKEND_DIR)
+
+from app.database import engine
+from app.crud import backfill_selection_participants
+
+def backfill_participants():
+    """
+    Create the selection_participants rows of selections that have none, e.g. after
+    the migration adding the table was applied as offline SQL.
+    """
+    print("\n=== Selection Participants Backfill ===\n")
+    
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = SessionLocal()
+    try:
+        created = backfill_selection_participants(db)
+        print(f"✅ Created {created} selection participant rows")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error backfilling selection participants: {e}")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    backfill_participants()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Load test: latency of light API requests while admins load heavy admin pages.
+
+Starts the app with uvicorn on a throwaway SQLite database, then runs
+concurrent admin clients (GET /admin/selections) next to regular clients
+(GET /api/v1/persons/). When admin handlers block the event loop, the
+regular clients' latency follows the duration of the admin pages.
+
+Usage: python benchmarks/admin_load.py [--admins 8] [--clients 8] [--seconds 10]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+# Point the app at a throwaway database before it is imported
+fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import httpx
+import uvicorn
+from sqlalchemy import text
+
+from app.database import Base, engine
+from app.main import app
+from app.utils import get_password_hash
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "admin-password"
+USERS = 30
+SELECTIONS = 1500
+
+
+def seed():
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, username, email, hashed_password, is_active, is_admin, weight, version) "
+            "VALUES (:id, :username, :email, :password, 1, :is_admin, 100.0, 0)"
+        ), [
+            {"id": i, "username": ADMIN_USERNAME if i == 1 else f"user{i}", "email": f"user{i}@example.com",
+             "password": get_password_hash(ADMIN_PASSWORD) if i == 1 else "", "is_admin": i == 1}
+            for i in range(1, USERS + 1)
+        ])
+        conn.execute(text(
+            "INSERT INTO records (id, title, artist, owner_id, used) VALUES (:id, :title, 'Artist', :owner_id, 1)"
+        ), [{"id": i, "title": f"Title {i}", "owner_id": i % USERS + 1} for i in range(1, SELECTIONS + 1)])
+        conn.execute(text(
+            "INSERT INTO selections (id, timestamp, chosen_user_id, record_id, user_id, participants, rating_sum, rating_count) "
+            "VALUES (:id, datetime('2015-01-01', :offset), :chosen, :id, 1, '1,2,3', 0, 0)"
+        ), [{"id": i, "offset": f"+{i * 7} days", "chosen": i % USERS + 1} for i in range(1, SELECTIONS + 1)])
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def client_loop(client: httpx.AsyncClient, url: str, headers: dict, deadline: float, latencies: list):
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def describe(latencies: list, seconds: float) -> str:
+    if not latencies:
+        return "0 requests"
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    return (f"{len(latencies) / seconds:7.1f} req/s, p50 {statistics.median(latencies):8.2f} ms, "
+            f"p95 {p95:8.2f} ms, max {latencies[-1]:8.2f} ms")
+
+
+async def run(base_url: str, admins: int, clients: int, seconds: float):
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        response = await client.post("/api/v1/token", data={"username": ADMIN_USERNAME, "password": ADMIN_PASSWORD})
+        response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # Baseline without admin traffic
+        baseline = []
+        await asyncio.gather(*[
+            client_loop(client, "/api/v1/persons/", headers, time.perf_counter() + seconds / 2, baseline)
+            for _ in range(clients)
+        ])
+
+        admin_latencies, client_latencies = [], []
+        deadline = time.perf_counter() + seconds
+        await asyncio.gather(
+            *[client_loop(client, "/admin/selections", headers, deadline, admin_latencies) for _ in range(admins)],
+            *[client_loop(client, "/api/v1/persons/", headers, deadline, client_latencies) for _ in range(clients)],
+        )
+
+    print(f"/api/v1/persons/ alone:           {describe(baseline, seconds / 2)}")
+    print(f"/api/v1/persons/ with admin load: {describe(client_latencies, seconds)}")
+    print(f"/admin/selections:                {describe(admin_latencies, seconds)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--admins", type=int, default=8)
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    try:
+        seed()
+        port = free_port()
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+        thread = threading.Thread(target=server.run, daemon=True)
+        thread.start()
+        while not server.started:
+            time.sleep(0.05)
+
+        asyncio.run(run(f"http://127.0.0.1:{port}", args.admins, args.clients, args.seconds))
+
+        server.should_exit = True
+        thread.join()
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(DB_PATH + suffix):
+                os.remove(DB_PATH + suffix)
+
+
+if __name__ == "__main__":
+    main()
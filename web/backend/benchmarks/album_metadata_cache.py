@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Album lookups against a local stub of RateYourMusic, MusicBrainz and Discogs,
+with a cold and a warm album_metadata cache.
+
+The stub answers RYM release pages directly, except for titles containing
+"mb-only" (RYM fails, MusicBrainz knows the album) and "unknown" (no source
+knows it). Every stub request sleeps --latency seconds. The first round fills
+the cache; the second should not reach the stub at all.
+
+Usage: python benchmarks/album_metadata_cache.py [--albums 20] [--latency 0.2]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+upstream_requests = Counter()
+LATENCY = 0.0
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status: int, body: str, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def do_GET(self):
+        time.sleep(LATENCY)
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        if url.path == "/":
+            upstream_requests["rym"] += 1
+            self.send(200, "<html></html>", "text/html")
+        elif url.path.startswith("/release/album/"):
+            upstream_requests["rym"] += 1
+            artist, title = url.path.strip("/").split("/")[2:4]
+            if "mb-only" in title or "unknown" in title:
+                self.send(403, "Forbidden", "text/html")
+                return
+            self.send(200, (
+                f'<html><head><meta property="og:image" content="//img.example/{title}.jpg"></head><body>'
+                f'<div class="album_title">{title.title()}</div><a class="artist">{artist.title()}</a></body></html>'
+            ), "text/html")
+        elif url.path == "/ws/2/release-group/":
+            upstream_requests["musicbrainz"] += 1
+            query = params["query"][0].lower()
+            groups = [] if "unknown" in query else [
+                {"id": "rg-1", "title": "MusicBrainz Title", "artist-credit": [{"name": "MusicBrainz Artist"}]}
+            ]
+            self.send(200, json.dumps({"release-groups": groups}), "application/json")
+        elif url.path == "/ws/2/release":
+            upstream_requests["musicbrainz"] += 1
+            self.send(200, json.dumps({"releases": [{"id": "release-1"}]}), "application/json")
+        elif url.path == "/database/search":
+            upstream_requests["discogs"] += 1
+            self.send(200, json.dumps({"results": []}), "application/json")
+        else:
+            self.send(404, "Not found", "text/plain")
+
+
+def main():
+    global LATENCY
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--albums", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    LATENCY = args.latency
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    stub_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Point the app at the stub and a throwaway database before it is imported
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ.update({
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "RYM_BASE_URL": stub_url,
+        "MUSICBRAINZ_BASE_URL": stub_url,
+        "DISCOGS_BASE_URL": stub_url,
+        "MUSICBRAINZ_REQUEST_INTERVAL": "0",
+    })
+
+    from app.album_metadata import lookup_album_by_rym_url
+    from app.database import Base, SessionLocal, engine
+
+    Base.metadata.create_all(engine)
+    kinds = ["album", "mb-only", "unknown"]
+    urls = [
+        f"https://rateyourmusic.com/release/album/artist-{i}/{kinds[i % len(kinds)]}-{i}/"
+        for i in range(args.albums)
+    ]
+
+    try:
+        for label in ("cold cache", "warm cache"):
+            upstream_requests.clear()
+            found = 0
+            start = time.perf_counter()
+            for url in urls:
+                db = SessionLocal()
+                try:
+                    lookup_album_by_rym_url(db, url)
+                    found += 1
+                except ValueError:
+                    pass
+                finally:
+                    db.close()
+            elapsed = time.perf_counter() - start
+            print(f"{label:<12} {elapsed / len(urls) * 1000:8.1f} ms/lookup, {found}/{len(urls)} found, "
+                  f"upstream requests: {dict(upstream_requests) or 0}")
+    finally:
+        server.shutdown()
+        engine.dispose()
+        os.remove(db_path)
+
+
+if __name__ == "__main__":
+    main()
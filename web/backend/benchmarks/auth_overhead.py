@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of the per-request authentication cost: auth.get_current_user
+with the principal cache (warm) and without it (a database lookup every time).
+
+Usage: python benchmarks/auth_overhead.py [--iterations 20000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from app.auth import get_current_user
+from app.db_models import Base
+from app.principals import principal_cache
+from app.utils import create_access_token
+
+
+def measure(label: str, iterations: int, SessionLocal, token: str, counter: dict, cached: bool):
+    principal_cache.invalidate()
+    counter["queries"] = 0
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if not cached:
+            principal_cache.invalidate()
+        # A fresh session per call, like the get_db dependency
+        db = SessionLocal()
+        try:
+            get_current_user(token=token, db=db)
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed / iterations * 1e6:8.1f} µs/request, "
+          f"{counter['queries'] / iterations:.3f} queries/request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=20_000)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO users (id, username, email, hashed_password, is_active, is_admin, weight, version) "
+                "VALUES (1, 'listener', 'listener@example.com', '', 1, 0, 100.0, 0)"
+            ))
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        counter = {"queries": 0}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def count_query(*args):
+            counter["queries"] += 1
+
+        token = create_access_token({"sub": "listener", "is_admin": False, "user_id": 1})
+        measure("database lookup (no cache)", args.iterations, SessionLocal, token, counter, cached=False)
+        measure("principal cache (warm)", args.iterations, SessionLocal, token, counter, cached=True)
+        engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
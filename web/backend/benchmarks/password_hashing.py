@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark password verification (the CPU-bound part of a login) for several
+bcrypt costs and, if argon2-cffi is installed, argon2.
+
+For every configuration it reports the latency of one verification and the
+login throughput with one thread per core, i.e. how /token scales when the
+threadpool runs concurrent logins.
+
+Usage: python benchmarks/password_hashing.py [--rounds 10 11 12 13] [--seconds 3]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from app.utils import create_password_context
+
+PASSWORD = "correct horse battery staple"
+
+
+def verify_for(context, hashed: str, seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    count = 0
+    while time.perf_counter() < deadline:
+        context.verify(PASSWORD, hashed)
+        count += 1
+    return count
+
+
+def benchmark(label: str, context, threads: int, seconds: float):
+    hashed = context.hash(PASSWORD)
+
+    start = time.perf_counter()
+    single = verify_for(context, hashed, seconds / 2)
+    latency = (time.perf_counter() - start) / single * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        futures = [executor.submit(verify_for, context, hashed, seconds) for _ in range(threads)]
+        total = sum(future.result() for future in futures)
+    throughput = total / seconds
+
+    print(f"{label:<16} {latency:8.1f} ms/login, {throughput:8.1f} logins/s on {threads} threads "
+          f"({throughput / threads:6.1f} per core)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13])
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for rounds in args.rounds:
+        benchmark(f"bcrypt {rounds} rounds", create_password_context("bcrypt", bcrypt_rounds=rounds), args.threads, args.seconds)
+
+    try:
+        import argon2  # noqa: F401
+    except ImportError:
+        print("argon2           skipped, argon2-cffi is not installed")
+    else:
+        benchmark("argon2", create_password_context("argon2"), args.threads, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Show query plans and timings of the hot record/selection/rating queries
+without and with the indexes added in migration 54703af8dac1.
+
+Seeds a throwaway SQLite database (100k records by default), so it never
+touches the application database.
+
+Usage: python benchmarks/query_plans.py [--records 100000] [--users 50] [--selections 5000]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine, text
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from app.db_models import Base
+
+# Indexes under test, as (name, table)
+INDEXES = [
+    ("ix_records_owner_id_used", "records"),
+    ("ix_selections_timestamp", "selections"),
+    ("ix_selections_timestamp_julianday", "selections"),
+    ("ix_selections_chosen_user_id", "selections"),
+    ("ix_selections_user_id", "selections"),
+    ("ix_ratings_selection_id_user_id", "ratings"),
+]
+
+# The predicates used by the draw, record listings, history and rating code
+QUERIES = {
+    "unused records of an owner (draw, /records/my)":
+        "SELECT id FROM records WHERE owner_id = :user_id AND used = 0",
+    "selection candidates (draw)":
+        "SELECT users.id, group_concat(records.id, ',') FROM users "
+        "JOIN records ON records.owner_id = users.id AND records.used = 0 "
+        "WHERE users.id IN (1, 2, 3, 4, 5, 6) GROUP BY users.id",
+    "history page (newest first)":
+        "SELECT id FROM selections ORDER BY julianday(timestamp) DESC, id DESC LIMIT 100",
+    "selections of a chosen user (stats, analytics)":
+        "SELECT COUNT(id), MAX(timestamp) FROM selections WHERE chosen_user_id = :user_id",
+    "selections initiated by a user (my history)":
+        "SELECT id FROM selections WHERE user_id = :user_id ORDER BY julianday(timestamp) DESC, id DESC LIMIT 100",
+    "existing rating lookup (rating)":
+        "SELECT id FROM ratings WHERE selection_id = :selection_id AND user_id = :user_id",
+}
+
+
+def seed(engine, records: int, users: int, selections: int):
+    rng = random.Random(0)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, username, email, hashed_password, is_active, is_admin, weight, version) "
+            "VALUES (:id, :username, :email, '', 1, 0, 100.0, 0)"
+        ), [{"id": i, "username": f"user{i}", "email": f"user{i}@example.com"} for i in range(1, users + 1)])
+        conn.execute(text(
+            "INSERT INTO records (id, title, artist, owner_id, used) VALUES (:id, :title, :artist, :owner_id, :used)"
+        ), [
+            {"id": i, "title": f"Title {i}", "artist": f"Artist {i % 5000}",
+             "owner_id": rng.randint(1, users), "used": rng.random() < 0.05}
+            for i in range(1, records + 1)
+        ])
+        conn.execute(text(
+            "INSERT INTO selections (id, timestamp, chosen_user_id, record_id, user_id, rating_sum, rating_count) "
+            "VALUES (:id, datetime('2015-01-01', :offset), :chosen, :record, :selector, 0, 0)"
+        ), [
+            {"id": i, "offset": f"+{i * 7} days", "chosen": rng.randint(1, users),
+             "record": rng.randint(1, records), "selector": rng.randint(1, users)}
+            for i in range(1, selections + 1)
+        ])
+        conn.execute(text(
+            "INSERT INTO ratings (rating, user_id, selection_id) VALUES (:rating, :user_id, :selection_id)"
+        ), [
+            {"rating": rng.randint(0, 10), "user_id": user_id, "selection_id": selection_id}
+            for selection_id in range(1, selections + 1)
+            for user_id in rng.sample(range(1, users + 1), min(users, 6))
+        ])
+
+
+def run_queries(engine, repeats: int):
+    params = {"user_id": 3, "selection_id": 42}
+    with engine.connect() as conn:
+        conn.execute(text("ANALYZE"))
+        for label, sql in QUERIES.items():
+            plan = conn.execute(text("EXPLAIN QUERY PLAN " + sql), params).fetchall()
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                conn.execute(text(sql), params).fetchall()
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"  {label}: median {statistics.median(timings):.3f} ms")
+            for row in plan:
+                print(f"      {row[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--selections", type=int, default=5_000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            for name, _ in INDEXES:
+                conn.execute(text(f"DROP INDEX {name}"))
+
+        print(f"Seeding {args.records} records, {args.users} users, {args.selections} selections...")
+        seed(engine, args.records, args.users, args.selections)
+
+        print("\n=== Without indexes ===")
+        run_queries(engine, args.repeats)
+
+        indexes = {index.name: index for table in Base.metadata.tables.values() for index in table.indexes}
+        with engine.begin() as conn:
+            for name, _ in INDEXES:
+                indexes[name].create(conn)
+
+        print("\n=== With indexes ===")
+        run_queries(engine, args.repeats)
+        engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
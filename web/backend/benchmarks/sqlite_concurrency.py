@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Compare SQLite PRAGMA profiles (database.SQLITE_PROFILES) under concurrent
+raters and history readers.
+
+Every profile gets a fresh throwaway database. Writer threads upsert ratings
+with crud.create_rating while reader threads page through the selection
+history; throughput, latency and "database is locked" errors are reported.
+
+Usage: python benchmarks/sqlite_concurrency.py [--writers 8] [--readers 8] [--seconds 5]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from app import crud
+from app.database import SQLITE_PROFILES, apply_sqlite_profile
+from app.db_models import Base
+
+USERS = 20
+SELECTIONS = 2000
+
+
+def seed(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO users (id, username, email, hashed_password, is_active, is_admin, weight, version) "
+            "VALUES (:id, :username, :email, '', 1, 0, 100.0, 0)"
+        ), [{"id": i, "username": f"user{i}", "email": f"user{i}@example.com"} for i in range(1, USERS + 1)])
+        conn.execute(text(
+            "INSERT INTO records (id, title, artist, owner_id, used) VALUES (:id, :title, 'Artist', :owner_id, 1)"
+        ), [{"id": i, "title": f"Title {i}", "owner_id": i % USERS + 1} for i in range(1, SELECTIONS + 1)])
+        conn.execute(text(
+            "INSERT INTO selections (id, timestamp, chosen_user_id, record_id, user_id, participants, rating_sum, rating_count) "
+            "VALUES (:id, datetime('2015-01-01', :offset), :chosen, :id, 1, '1,2,3', 0, 0)"
+        ), [{"id": i, "offset": f"+{i * 7} days", "chosen": i % USERS + 1} for i in range(1, SELECTIONS + 1)])
+
+
+def run_profile(profile: str, writers: int, readers: int, seconds: float) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine, profile)
+    Base.metadata.create_all(engine)
+    seed(engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    lock = threading.Lock()
+    results = {"write": [], "read": [], "locked": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    def worker(kind: str, seed_value: int):
+        rng = random.Random(seed_value)
+        db = SessionLocal()
+        latencies = []
+        locked = errors = 0
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    if kind == "write":
+                        crud.create_rating(db, rng.randint(1, USERS), rng.randint(1, SELECTIONS), rng.randint(0, 10))
+                    else:
+                        crud.get_selection_history(db, limit=50, sort_by_rating=rng.random() < 0.5)
+                        db.rollback()
+                except OperationalError as e:
+                    db.rollback()
+                    if "locked" in str(e.orig).lower() or "busy" in str(e.orig).lower():
+                        locked += 1
+                    else:
+                        errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+        with lock:
+            results[kind].extend(latencies)
+            results["locked"] += locked
+            results["errors"] += errors
+
+    threads = [threading.Thread(target=worker, args=("write", i)) for i in range(writers)]
+    threads += [threading.Thread(target=worker, args=("read", writers + i)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return results
+
+
+def describe(latencies: list, seconds: float) -> str:
+    if not latencies:
+        return "0 ops"
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if len(latencies) >= 20 else latencies[-1]
+    return (f"{len(latencies) / seconds:8.1f} ops/s, "
+            f"p50 {statistics.median(latencies):7.2f} ms, p95 {p95:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--profiles", nargs="+", default=list(SQLITE_PROFILES))
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        print(f"=== {profile} ({args.writers} writers, {args.readers} readers, {args.seconds}s) ===")
+        results = run_profile(profile, args.writers, args.readers, args.seconds)
+        print(f"  ratings: {describe(results['write'], args.seconds)}")
+        print(f"  history: {describe(results['read'], args.seconds)}")
+        print(f"  locked errors: {results['locked']}, other errors: {results['errors']}")
+
+
+if __name__ == "__main__":
+    main()
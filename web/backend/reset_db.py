@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 import os
 import sys
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 # Add backend directory to sys.path
@@ -9,7 +8,7 @@ BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(BACKEND_DIR)
 
 from app.db_models import Base, User
-from app.database import SQLALCHEMY_DATABASE_URL
+from app.database import create_db_engine
 from app.crud import get_password_hash
 
 # --- Admin User Details ---
@@ -31,7 +30,7 @@ def reset_database():
     print("\nResetting database...")
     
     # Create engine
-    engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+    engine = create_db_engine(pooled=False)
     SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
     
     # Drop all tables
@@ -20,10 +20,12 @@ import {
   DialogTitle,
   TextField,
   Snackbar,
+  TablePagination,
+  TableSortLabel,
+  MenuItem,
 } from '@mui/material';
 import { Edit as EditIcon } from '@mui/icons-material';
-import axios from 'axios';
-import AuthService from '../services/AuthService';
+import { api } from '../services/ApiService';
 
 // The API_URL contains '/api/v1' but admin endpoints are directly at '/admin'
 const BASE_URL = process.env.REACT_APP_API_URL.replace('/api/v1', '');
@@ -37,18 +39,47 @@ const AdminRecords = () => {
   const [selectedRecord, setSelectedRecord] = useState(null);
   const [formData, setFormData] = useState({ title: '', artist: '', cover_url: '' });
   const [snackbar, setSnackbar] = useState({ open: false, message: '', severity: 'success' });
+  // Server-side paging, sorting and filtering
+  const [page, setPage] = useState(0);
+  const [rowsPerPage, setRowsPerPage] = useState(50);
+  const [totalCount, setTotalCount] = useState(0);
+  const [sort, setSort] = useState({ by: 'id', descending: false });
+  const [filters, setFilters] = useState({ artistPrefix: '', ownerId: '', used: '' });
+  const [owners, setOwners] = useState([]);
 
   useEffect(() => {
-    fetchRecords();
+    fetchOwners();
   }, []);
 
+  useEffect(() => {
+    fetchRecords();
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [page, rowsPerPage, sort, filters]);
+
+  const fetchOwners = async () => {
+    try {
+      const response = await api.get(`${ADMIN_API_URL}/users/api`);
+      setOwners(response.data);
+    } catch (err) {
+      console.error('Error fetching owners:', err);
+    }
+  };
+
   const fetchRecords = async () => {
     try {
       setLoading(true);
-      const response = await axios.get(`${ADMIN_API_URL}/records/api`, {
-        headers: { ...AuthService.getAuthHeader() }
-      });
+      const params = {
+        skip: page * rowsPerPage,
+        limit: rowsPerPage,
+        sort_by: sort.by,
+        descending: sort.descending,
+      };
+      if (filters.artistPrefix) params.artist_prefix = filters.artistPrefix;
+      if (filters.ownerId !== '') params.owner_id = filters.ownerId;
+      if (filters.used !== '') params.used = filters.used;
+      const response = await api.get(`${ADMIN_API_URL}/records/api`, { params });
       setRecords(response.data);
+      setTotalCount(parseInt(response.headers['x-total-count'], 10) || 0);
       setLoading(false);
     } catch (err) {
       console.error('Error fetching records:', err);
@@ -57,6 +88,32 @@ const AdminRecords = () => {
     }
   };
 
+  // Change a filter and go back to the first page
+  const handleFilterChange = (e) => {
+    const { name, value } = e.target;
+    setFilters({ ...filters, [name]: value });
+    setPage(0);
+  };
+
+  // Toggle sorting by a column
+  const handleSort = (column) => {
+    setSort({
+      by: column,
+      descending: sort.by === column ? !sort.descending : false
+    });
+    setPage(0);
+  };
+
+  const sortableHeader = (column, label) => (
+    <TableSortLabel
+      active={sort.by === column}
+      direction={sort.by === column && sort.descending ? 'desc' : 'asc'}
+      onClick={() => handleSort(column)}
+    >
+      {label}
+    </TableSortLabel>
+  );
+
   // Handle form input change (Added)
   const handleInputChange = (e) => {
     const { name, value } = e.target;
@@ -78,33 +135,8 @@ const AdminRecords = () => {
   const handleUpdateRecord = async () => {
     if (!selectedRecord) return;
     
-    // Check if token might be expired
-    if (AuthService.isTokenExpired()) {
-      setSnackbar({
-        open: true,
-        message: 'Your session may have expired. Please log in again.',
-        severity: 'warning'
-      });
-      // You could also redirect to login page if needed:
-      // window.location.href = '/login';
-      return;
-    }
-    
     try {
-      // Log the auth headers for debugging
-      console.log('Auth headers:', AuthService.getAuthHeader());
-      
-      // Make the API request with explicit headers
-      await axios.put(
-        `${ADMIN_API_URL}/records/api/${selectedRecord.id}`, 
-        formData, 
-        {
-          headers: { 
-            ...AuthService.getAuthHeader(),
-            'Content-Type': 'application/json'
-          }
-        }
-      );
+      await api.put(`${ADMIN_API_URL}/records/api/${selectedRecord.id}`, formData);
       
       setOpenEditDialog(false);
       fetchRecords(); // Refresh records list
@@ -148,6 +180,43 @@ const AdminRecords = () => {
         </Typography>
       </Box>
 
+      <Box sx={{ display: 'flex', gap: 2, mb: 2 }}>
+        <TextField
+          name="artistPrefix"
+          label="Artist starts with"
+          size="small"
+          value={filters.artistPrefix}
+          onChange={handleFilterChange}
+        />
+        <TextField
+          select
+          name="ownerId"
+          label="Owner"
+          size="small"
+          value={filters.ownerId}
+          onChange={handleFilterChange}
+          sx={{ minWidth: 160 }}
+        >
+          <MenuItem value="">All</MenuItem>
+          {owners.map((owner) => (
+            <MenuItem key={owner.id} value={owner.id}>{owner.username}</MenuItem>
+          ))}
+        </TextField>
+        <TextField
+          select
+          name="used"
+          label="Status"
+          size="small"
+          value={filters.used}
+          onChange={handleFilterChange}
+          sx={{ minWidth: 140 }}
+        >
+          <MenuItem value="">All</MenuItem>
+          <MenuItem value="false">Available</MenuItem>
+          <MenuItem value="true">Used</MenuItem>
+        </TextField>
+      </Box>
+
       {loading ? (
         <Box sx={{ display: 'flex', justifyContent: 'center', my: 4 }}>
           <CircularProgress />
@@ -163,11 +232,11 @@ const AdminRecords = () => {
               <Table aria-label="records table">
                 <TableHead>
                   <TableRow>
-                    <TableCell>ID</TableCell>
-                    <TableCell>Title</TableCell>
-                    <TableCell>Artist</TableCell>
-                    <TableCell>Owner</TableCell>
-                    <TableCell>Status</TableCell>
+                    <TableCell>{sortableHeader('id', 'ID')}</TableCell>
+                    <TableCell>{sortableHeader('title', 'Title')}</TableCell>
+                    <TableCell>{sortableHeader('artist', 'Artist')}</TableCell>
+                    <TableCell>{sortableHeader('owner_name', 'Owner')}</TableCell>
+                    <TableCell>{sortableHeader('used', 'Status')}</TableCell>
                     <TableCell>Actions</TableCell>
                   </TableRow>
                 </TableHead>
@@ -199,6 +268,18 @@ const AdminRecords = () => {
                   ))}
                 </TableBody>
               </Table>
+              <TablePagination
+                component="div"
+                count={totalCount}
+                page={page}
+                rowsPerPage={rowsPerPage}
+                rowsPerPageOptions={[25, 50, 100, 250]}
+                onPageChange={(event, newPage) => setPage(newPage)}
+                onRowsPerPageChange={(event) => {
+                  setRowsPerPage(parseInt(event.target.value, 10));
+                  setPage(0);
+                }}
+              />
             </TableContainer>
           ) : (
             <Box sx={{ textAlign: 'center', py: 4 }}>
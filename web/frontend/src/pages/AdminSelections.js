@@ -25,8 +25,7 @@ import {
   Sort as SortIcon,
   Grade as GradeIcon,
 } from '@mui/icons-material';
-import axios from 'axios';
-import AuthService from '../services/AuthService';
+import { api } from '../services/ApiService';
 
 // The API_URL contains '/api/v1' but admin endpoints are directly at '/admin'
 const BASE_URL = process.env.REACT_APP_API_URL.replace('/api/v1', '');
@@ -46,8 +45,7 @@ const AdminSelections = () => {
     try {
       setLoading(true);
       const sortByRating = sortBy === 'rating';
-      const response = await axios.get(`${ADMIN_API_URL}/selections/api`, {
-        headers: { ...AuthService.getAuthHeader() },
+      const response = await api.get(`${ADMIN_API_URL}/selections/api`, {
         params: { sort_by_rating: sortByRating }
       });
       setSelections(response.data);
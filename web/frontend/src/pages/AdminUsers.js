@@ -7,8 +7,7 @@ import {
   IconButton, Snackbar, Alert
 } from '@mui/material';
 import { Edit as EditIcon, Delete as DeleteIcon, Add as AddIcon } from '@mui/icons-material';
-import axios from 'axios';
-import AuthService from '../services/AuthService';
+import { api } from '../services/ApiService';
 
 // The API_URL contains '/api/v1' but admin endpoints are directly at '/admin'
 // So we need to get the base URL without the '/api/v1' part
@@ -40,9 +39,7 @@ const AdminUsers = () => {
   const fetchUsers = async () => {
     try {
       setLoading(true);
-      const response = await axios.get(`${ADMIN_API_URL}/users/api`, {
-        headers: { ...AuthService.getAuthHeader() }
-      });
+      const response = await api.get(`${ADMIN_API_URL}/users/api`);
       setUsers(response.data);
       setLoading(false);
     } catch (error) {
@@ -101,9 +98,7 @@ const AdminUsers = () => {
   // Add new user
   const handleAddUser = async () => {
     try {
-      await axios.post(`${ADMIN_API_URL}/users/api`, formData, {
-        headers: { ...AuthService.getAuthHeader() }
-      });
+      await api.post(`${ADMIN_API_URL}/users/api`, formData);
       setOpenAddDialog(false);
       fetchUsers();
       setSnackbar({
@@ -130,9 +125,7 @@ const AdminUsers = () => {
         delete updateData.password;
       }
       
-      await axios.put(`${ADMIN_API_URL}/users/api/${selectedUser.id}`, updateData, {
-        headers: { ...AuthService.getAuthHeader() }
-      });
+      await api.put(`${ADMIN_API_URL}/users/api/${selectedUser.id}`, updateData);
       setOpenEditDialog(false);
       fetchUsers();
       setSnackbar({
@@ -153,9 +146,7 @@ const AdminUsers = () => {
   // Delete user
   const handleDeleteUser = async () => {
     try {
-      await axios.delete(`${ADMIN_API_URL}/users/api/${selectedUser.id}`, {
-        headers: { ...AuthService.getAuthHeader() }
-      });
+      await api.delete(`${ADMIN_API_URL}/users/api/${selectedUser.id}`);
       setOpenDeleteDialog(false);
       fetchUsers();
       setSnackbar({
@@ -32,6 +32,7 @@ import {
   TableHead,
   TableRow,
   TableSortLabel,
+  TextField,
   Toolbar,
 } from '@mui/material';
 import { 
@@ -88,6 +89,9 @@ function stableSort(array, comparator) {
   return stabilizedThis.map((el) => el[0]);
 }
 
+// Upper limit of draws in one batch request (see POST /selection/batch)
+const MAX_ROUNDS = 50;
+
 // Define table headers
 const headCells = [
   { id: 'present', numeric: false, disablePadding: true, label: 'Present' },
@@ -101,7 +105,8 @@ const Selection = () => {
   const [users, setUsers] = useState([]);
   const [allRecords, setAllRecords] = useState([]);
   const [selectedUsers, setSelectedUsers] = useState([]);
-  const [selectionResult, setSelectionResult] = useState(null);
+  const [rounds, setRounds] = useState(1);
+  const [selectionResults, setSelectionResults] = useState([]);
   const [loading, setLoading] = useState(true);
   const [selecting, setSelecting] = useState(false);
   const [error, setError] = useState('');
@@ -171,6 +176,11 @@ const Selection = () => {
       return stableSort(users, getComparator(order, orderBy));
   }, [users, order, orderBy]);
 
+  const handleRoundsChange = (event) => {
+    const value = parseInt(event.target.value, 10);
+    setRounds(Number.isNaN(value) ? 1 : Math.min(Math.max(value, 1), MAX_ROUNDS));
+  };
+
   const handlePerformSelection = async () => {
     if (selectedUsers.length < 2) {
       setError('Please select at least 2 users');
@@ -189,22 +199,27 @@ const Selection = () => {
       // Simulating some delay for dramatic effect
       await new Promise(resolve => setTimeout(resolve, 2000));
       
-      const result = await ApiService.performSelection(selectedUsers);
-      
-      // Find the selected record to get cover_url
-      const recordParts = result.chosen_record.split(' - ');
-      const artist = recordParts[0];
-      const title = recordParts.slice(1).join(' - '); // Handle titles with hyphens
+      // Several draws are made in one request, with the weights updated in between
+      const results = rounds > 1
+        ? await ApiService.performBatchSelection(selectedUsers, rounds)
+        : [await ApiService.performSelection(selectedUsers)];
       
-      const selectedRecord = allRecords.find(
-        record => record.artist === artist && record.title === title
-      );
-      
-      if (selectedRecord) {
-        result.cover_url = selectedRecord.cover_url;
-      }
+      results.forEach(result => {
+        // Find the selected record to get cover_url
+        const recordParts = result.chosen_record.split(' - ');
+        const artist = recordParts[0];
+        const title = recordParts.slice(1).join(' - '); // Handle titles with hyphens
+        
+        const selectedRecord = allRecords.find(
+          record => record.artist === artist && record.title === title
+        );
+        
+        if (selectedRecord) {
+          result.cover_url = selectedRecord.cover_url;
+        }
+      });
       
-      setSelectionResult(result);
+      setSelectionResults(results);
       setResultDialogOpen(true);
       setSuccess(true);
     } catch (err) {
@@ -359,7 +374,17 @@ const Selection = () => {
                 
                 <Divider sx={{ my: 3 }} />
                 
-                <Box sx={{ display: 'flex', justifyContent: 'center' }}>
+                <Box sx={{ display: 'flex', justifyContent: 'center', alignItems: 'center', gap: 2 }}>
+                  <TextField
+                    label="Draws"
+                    type="number"
+                    size="small"
+                    value={rounds}
+                    onChange={handleRoundsChange}
+                    inputProps={{ min: 1, max: MAX_ROUNDS }}
+                    disabled={selecting}
+                    sx={{ width: 100 }}
+                  />
                   <Button
                     variant="contained"
                     color="primary"
@@ -369,7 +394,7 @@ const Selection = () => {
                     disabled={selecting || selectedUsers.length < 2}
                     sx={{ px: 4, py: 1.5 }}
                   >
-                    {selecting ? 'Selecting...' : 'Perform Selection'}
+                    {selecting ? 'Selecting...' : (rounds > 1 ? `Perform ${rounds} Selections` : 'Perform Selection')}
                   </Button>
                 </Box>
               </>
@@ -431,29 +456,38 @@ const Selection = () => {
           </Typography>
         </DialogTitle>
         <DialogContent>
-          {selectionResult && (
+          {selectionResults.length > 0 && (
             <Box sx={{ display: 'flex', flexDirection: 'column', alignItems: 'center', py: 2 }}>
-              <Box sx={{ display: 'flex', alignItems: 'center', mb: 2 }}>
-                <PersonIcon color="primary" sx={{ fontSize: 30, mr: 1 }} />
-                <Typography variant="h5" color="primary.main">
-                  {selectionResult.chosen_username}
-                </Typography>
-              </Box>
-              
-              <Box sx={{ display: 'flex', alignItems: 'center', mb: 4 }}>
-                {selectionResult.cover_url ? (
-                  <Avatar 
-                    src={selectionResult.cover_url} 
-                    alt={selectionResult.chosen_record}
-                    sx={{ width: 60, height: 60, mr: 2 }}
-                  />
-                ) : (
-                  <MusicIcon color="secondary" sx={{ fontSize: 30, mr: 1 }} />
-                )}
-                <Typography variant="h6" color="secondary.main">
-                  {selectionResult.chosen_record}
-                </Typography>
-              </Box>
+              {selectionResults.map((selectionResult, drawIndex) => (
+                <Box key={drawIndex} sx={{ display: 'flex', flexDirection: 'column', alignItems: 'center' }}>
+                  {selectionResults.length > 1 && (
+                    <Typography variant="overline" color="text.secondary">
+                      Draw {drawIndex + 1}
+                    </Typography>
+                  )}
+                  <Box sx={{ display: 'flex', alignItems: 'center', mb: 2 }}>
+                    <PersonIcon color="primary" sx={{ fontSize: 30, mr: 1 }} />
+                    <Typography variant="h5" color="primary.main">
+                      {selectionResult.chosen_username}
+                    </Typography>
+                  </Box>
+                  
+                  <Box sx={{ display: 'flex', alignItems: 'center', mb: 4 }}>
+                    {selectionResult.cover_url ? (
+                      <Avatar 
+                        src={selectionResult.cover_url} 
+                        alt={selectionResult.chosen_record}
+                        sx={{ width: 60, height: 60, mr: 2 }}
+                      />
+                    ) : (
+                      <MusicIcon color="secondary" sx={{ fontSize: 30, mr: 1 }} />
+                    )}
+                    <Typography variant="h6" color="secondary.main">
+                      {selectionResult.chosen_record}
+                    </Typography>
+                  </Box>
+                </Box>
+              ))}
               
               <Typography variant="subtitle1" gutterBottom>
                 New Weights:
@@ -466,7 +500,7 @@ const Selection = () => {
                     <ListItem key={user.id}>
                       <ListItemText
                         primary={user.username}
-                        secondary={`New weight: ${selectionResult.new_weights[index]}`}
+                        secondary={`New weight: ${selectionResults[selectionResults.length - 1].new_weights[index]}`}
                       />
                     </ListItem>
                   ))}
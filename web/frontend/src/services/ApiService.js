@@ -4,7 +4,8 @@ import AuthService from './AuthService';
 const API_URL = process.env.REACT_APP_API_URL;
 
 // Create axios instance with interceptors for auth
-const api = axios.create({
+// Also used by the admin pages, with absolute URLs outside API_URL
+export const api = axios.create({
   baseURL: API_URL,
 });
 
@@ -28,8 +29,20 @@ api.interceptors.response.use(
     // Any status code that lie within the range of 2xx cause this function to trigger
     return response;
   },
-  (error) => {
+  async (error) => {
     // Any status codes that falls outside the range of 2xx cause this function to trigger
+    const originalRequest = error.config;
+    if (error.response && error.response.status === 401 && originalRequest && !originalRequest._retry) {
+      // The access token expired - get a new one with the refresh token and retry once
+      originalRequest._retry = true;
+      try {
+        const user = await AuthService.refresh();
+        originalRequest.headers.Authorization = `Bearer ${user.access_token}`;
+        return api(originalRequest);
+      } catch (refreshError) {
+        console.log("AuthService: Could not refresh the session.");
+      }
+    }
     if (error.response && error.response.status === 401) {
       console.log("AuthService: Received 401 Unauthorized. Logging out.");
       AuthService.logout();
@@ -109,6 +122,12 @@ class ApiService {
     return response.data;
   }
 
+  async performBatchSelection(participantIds, rounds) {
+    const queryParams = participantIds.map(id => `participant_ids=${id}`).join('&');
+    const response = await api.post(`/selection/batch?${queryParams}&rounds=${rounds}`);
+    return response.data;
+  }
+
   async getSelectionHistory(mySelectionsOnly = false, sortByRating = false, timestamp = null) {
     try {
       const queryParams = [];
@@ -171,11 +190,10 @@ class ApiService {
       
       console.log(`Making API call to ${API_URL}${cacheBustUrl}${queryString}`);
       
-      const response = await axios({
+      const response = await api({
         method: 'GET',
-        url: `${API_URL}${cacheBustUrl}${queryString}`,
+        url: `${cacheBustUrl}${queryString}`,
         headers: {
-          ...AuthService.getAuthHeader(),
           'Cache-Control': 'no-cache, no-store, must-revalidate',
           'Pragma': 'no-cache',
           'Expires': '0',
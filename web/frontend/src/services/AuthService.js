@@ -4,6 +4,9 @@ import { jwtDecode } from 'jwt-decode';
 const API_URL = process.env.REACT_APP_API_URL;
 
 class AuthService {
+  // Shared by all requests that hit a 401 at the same time, so the refresh token is rotated once
+  refreshPromise = null;
+
   async login(username, password) {
     const params = new URLSearchParams();
     params.append('username', username);
@@ -32,7 +35,44 @@ class AuthService {
     return null;
   }
 
+  async refresh() {
+    if (!this.refreshPromise) {
+      this.refreshPromise = this.rotateRefreshToken().finally(() => {
+        this.refreshPromise = null;
+      });
+    }
+    return this.refreshPromise;
+  }
+
+  async rotateRefreshToken() {
+    const user = this.getCurrentUser();
+    if (!user || !user.refresh_token) {
+      throw new Error('No refresh token available');
+    }
+
+    try {
+      const response = await axios.post(`${API_URL}/token/refresh`, {
+        refresh_token: user.refresh_token
+      });
+      const userData = { ...user, ...response.data };
+      localStorage.setItem('user', JSON.stringify(userData));
+      return userData;
+    } catch (error) {
+      // Another tab may have rotated the token in the meantime
+      const current = this.getCurrentUser();
+      if (current && current.refresh_token !== user.refresh_token) {
+        return current;
+      }
+      throw error;
+    }
+  }
+
   logout() {
+    const user = this.getCurrentUser();
+    if (user && user.refresh_token) {
+      // Revoke the session server-side; the local logout doesn't wait for it
+      axios.post(`${API_URL}/logout`, { refresh_token: user.refresh_token }).catch(() => {});
+    }
     localStorage.removeItem('user');
   }
 